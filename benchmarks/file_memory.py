@@ -0,0 +1,94 @@
+"""
+Measures memory per file for packages created from a synthetic archive.
+
+    python benchmarks/file_memory.py --files 100000
+    python benchmarks/file_memory.py --files 100000 --lazy
+"""
+import argparse
+import gc
+import pathlib
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import file_explorer
+from file_explorer.tests.test_data import HDR_TEST_FILE
+
+SUFFIXES = ['.hex', '.hdr', '.cnv', '.bl', '.jpg']
+STATIONS = [f'STATION {nr}' for nr in range(50)]
+
+
+def get_header_for_cast(header, cast):
+    """ Returns header with the values that differ between casts in a real archive (position, weather, comments,
+    LIMS job etc.) changed """
+    rnd = random.Random(cast)
+    replacements = {
+        'HUVUDSKÄR': STATIONS[cast % len(STATIONS)],
+        '58 56.19 N': f'{rnd.randint(54, 65)} {rnd.uniform(0, 60):05.2f} N',
+        '019 09.31 E': f'{rnd.randint(10, 25):03d} {rnd.uniform(0, 60):05.2f} E',
+        'MHan': rnd.choice(['MHan', 'LBa', 'KRo', 'AnnS']),
+        'WADEP: 90': f'WADEP: {rnd.randint(10, 400)}',
+        'WINDIR: 23': f'WINDIR: {rnd.randint(0, 35)}',
+        'WINSP: 8': f'WINSP: {rnd.randint(0, 20)}',
+        'AIRTEMP: 13.8': f'AIRTEMP: {rnd.uniform(-10, 25):.1f}',
+        'AIRPRES: 1009.5': f'AIRPRES: {rnd.uniform(980, 1040):.1f}',
+        'Test av nya CTD-systemet': f'Kommentar {rnd.randint(0, 10 ** 6)}',
+        '20227710-0511': f'2022{rnd.randint(1000, 9999)}-{cast % 10000:04d}',
+    }
+    for old, new in replacements.items():
+        header = header.replace(old, new)
+    return header
+
+
+def create_archive(directory, nr_files):
+    """ Creates nr_files files in casts of len(SUFFIXES) files. All files have the header of HDR_TEST_FILE with
+    station, position, weather, comments and time changed for each cast. """
+    header = HDR_TEST_FILE.read_text(encoding='cp1252')
+    paths = []
+    cast = 0
+    while len(paths) < nr_files:
+        month = cast // 2000 % 12 + 1
+        day = cast // 70 % 28 + 1
+        hour = cast // 3 % 24
+        minute = cast % 60
+        serno = cast % 10000
+        cast_dir = pathlib.Path(directory, f'{month:02d}')
+        cast_dir.mkdir(exist_ok=True)
+        text = get_header_for_cast(header, cast)
+        text = text.replace('Jun 13 2022 18:02', f'Jun {day:02d} 2022 {hour:02d}:{minute:02d}')
+        stem = f'SBE09_1387_2022{month:02d}{day:02d}_{hour:02d}{minute:02d}_77SE_{cast % 40:02d}_{serno:04d}'
+        for suffix in SUFFIXES[:nr_files - len(paths)]:
+            path = pathlib.Path(cast_dir, f'{stem}{suffix}')
+            path.write_text(text, encoding='cp1252')
+            paths.append(path)
+        cast += 1
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=100_000)
+    parser.add_argument('--lazy', action='store_true')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = create_archive(directory, args.files)
+        gc.collect()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        packages = file_explorer.get_packages_from_file_list(paths, as_list=True, lazy=args.lazy)
+        elapsed = time.perf_counter() - t0
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{len(paths)} files in {len(packages)} packages (lazy={args.lazy}) in {elapsed:.1f} s')
+        print(f'Memory per file: {current / len(paths):.0f} bytes (peak {peak / len(paths):.0f} bytes)')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import concurrent.futures
 import datetime
 import logging
 import os
@@ -12,6 +13,8 @@ from file_explorer import sharkweb
 from file_explorer import utils
 from file_explorer.file import InstrumentFile
 from file_explorer.file import UnrecognizedFile
+from file_explorer.file_index import FileIndex
+from file_explorer.file_index import get_file_index
 from file_explorer.odv import odv_file
 from file_explorer.other import prs_file
 from file_explorer.package import MvpPackage
@@ -105,42 +108,126 @@ PACKAGES = {
     PrsPackage.INSTRUMENT_TYPE: PrsPackage
 }
 
+# Sub directories holding one type of file for the casts in the parent directory (e.g. <cruise>/raw and <cruise>/cnv).
+# iter_packages_in_directory packs files in these together with the files in the parent directory.
+FILE_TYPE_DIRECTORIES = {'source', 'raw', 'cnv', 'cnv_up', 'up_cast', 'data', 'plot', 'plots', 'temp',
+                         'standard_format'}
+
+
+def _path_is_selected(path, stem: str = '', exclude_directory=None, exclude_suffix=None,
+                      exclude_string: str | list[str] = 'collection', suffix: str = '', match_string=None, **kwargs):
+    """ Returns True if path passes the filters used when listing files in a directory tree """
+    path = Path(path)
+    if match_string and match_string not in path.name:
+        return False
+    if suffix and path.suffix.lower() != suffix.lower():
+        return False
+    if stem and stem.lower() not in path.stem.lower():
+        return False
+    if exclude_directory and exclude_directory in path.parts:
+        return False
+    if exclude_suffix and path.suffix == exclude_suffix:
+        return False
+    if exclude_string:
+        if type(exclude_string) is str:
+            exclude_string = [exclude_string]
+        for excl in exclude_string:
+            if excl.lower() in str(path).lower():
+                return False
+    return True
+
+
+def _split_suffix(name):
+    """ Returns stem and suffix of a file name, the same as pathlib does """
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ''
+
+
+def _iter_selected_paths_by_directory(directory, stem: str = '', exclude_directory=None, exclude_suffix=None,
+                                      exclude_string: str | list[str] = 'collection', suffix: str = '',
+                                      match_string=None, **kwargs):
+    """
+    Walks the directory tree with os.scandir in the same order as os.walk(topdown=False) and yields
+    (directory, paths) with the paths of the files in each directory that pass the same filters as
+    _path_is_selected. Directories that are excluded by exclude_directory or exclude_string are not entered.
+    """
+    root = str(Path(directory))
+    if not exclude_string:
+        exclude_string = []
+    elif type(exclude_string) is str:
+        exclude_string = [exclude_string]
+    exclude_strings = [excl.lower() for excl in exclude_string]
+    stem = stem.lower() if stem else ''
+    suffix = suffix.lower() if suffix else ''
+
+    def _is_excluded(path):
+        path = path.lower()
+        return any(excl in path for excl in exclude_strings)
+
+    def _walk(top):
+        try:
+            with os.scandir(top) as it:
+                entries = list(it)
+        except OSError:
+            return
+        sub_directories = []
+        paths = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Symbolic links to directories are not followed, as in os.walk
+                if entry.is_symlink() or name == exclude_directory or _is_excluded(entry.path):
+                    continue
+                sub_directories.append(entry.path)
+                continue
+            if match_string and match_string not in name:
+                continue
+            name_stem, name_suffix = _split_suffix(name)
+            if suffix and name_suffix.lower() != suffix:
+                continue
+            if stem and stem not in name_stem.lower():
+                continue
+            if exclude_directory and name == exclude_directory:
+                continue
+            if exclude_suffix and name_suffix == exclude_suffix:
+                continue
+            if exclude_strings and _is_excluded(entry.path):
+                continue
+            paths.append(Path(entry.path))
+        for sub_directory in sub_directories:
+            yield from _walk(sub_directory)
+        yield Path(top), paths
+
+    if exclude_directory and exclude_directory in Path(root).parts:
+        return
+    if _is_excluded(root):
+        return
+    yield from _walk(root)
+
+
+def _iter_paths_in_directory_tree(directory, **kwargs):
+    """ Yields the file paths in the given directory tree. See _iter_selected_paths_by_directory for filters. """
+    for _, paths in _iter_selected_paths_by_directory(directory, **kwargs):
+        yield from paths
+
 
 def _get_paths_in_directory_tree(directory, stem: str = '', exclude_directory=None,
                                  exclude_suffix=None, exclude_string: str | list[str] = 'collection', suffix: str = '',
                                  **kwargs):
     """ Returns a list with all file paths in the given directory. Including all sub directories. """
-    # if not any([stem, exclude_directory]):
-    #     return Path(directory).glob(f'**/*{suffix}*')
     logger.debug('_get_paths_in_directory_tree')
     logger.debug(f'directory is set to: {directory}')
     logger.debug(f'stem is set to: {stem}')
     logger.debug(f'suffix is set to: {suffix}')
-    match_string = kwargs.get('match_string')
-    all_files = []
-    for root, dirs, files in os.walk(directory, topdown=False):
-        for name in files:
-            if match_string and match_string not in name:
-                continue
-            path = Path(root, name)
-            if suffix and path.suffix.lower() != suffix.lower():
-                continue
-            if stem and stem.lower() not in path.stem.lower():
-                continue
-            all_files.append(path)
-    if exclude_directory:
-        logger.debug(f'exclude_directory is set to: {exclude_directory}')
-        all_files = [path for path in all_files if exclude_directory not in path.parts]
-    if exclude_suffix:
-        logger.debug(f'exclude_suffix is set to: {exclude_suffix}')
-        all_files = [path for path in all_files if path.suffix != exclude_suffix]
-    if exclude_string:
-        logger.debug(f'exclude_string is set to: {exclude_string}')
-        if type(exclude_string) is str:
-            exclude_string = [exclude_string]
-        for excl in exclude_string:
-            all_files = [path for path in all_files if excl.lower() not in str(path).lower()]
-    return all_files
+    return list(_iter_paths_in_directory_tree(directory, stem=stem, exclude_directory=exclude_directory,
+                                              exclude_suffix=exclude_suffix, exclude_string=exclude_string,
+                                              suffix=suffix, **kwargs))
 
 
 def _get_paths_in_directory(directory):
@@ -149,7 +236,30 @@ def _get_paths_in_directory(directory):
     return [path for path in Path(directory).iterdir() if path.is_file()]
 
 
-def get_file_object_for_path(path, instrument_type='sbe', **kwargs):
+def get_file_object_for_path(path, instrument_type='sbe', index=None, **kwargs):
+    """
+    Returns the file object for the given path. If index is given (a FileIndex, a path to an index file or True for
+    the default index) unchanged files are loaded from the index instead of being parsed.
+    """
+    path = Path(path)
+    index = get_file_index(index)
+    obj = None
+    if index:
+        obj = index.get_file(path, instrument_type=instrument_type, **kwargs)
+    if not obj:
+        obj = _create_file_object(path, instrument_type=instrument_type, **kwargs)
+        if obj and index:
+            index.add_file(obj, instrument_type=instrument_type, **kwargs)
+    if not obj:
+        return obj
+    if not utils.is_matching(obj, **kwargs):
+        logger.debug(f'File not matching filter: {path}')
+        return None
+    return obj
+
+
+def _create_file_object(path, instrument_type='sbe', **kwargs):
+    """ Parses the file at path. Returns False if the file is not recognized. Filter arguments are not checked. """
     path = Path(path)
     itype = FILES.get(instrument_type)
     if not itype:
@@ -159,34 +269,79 @@ def get_file_object_for_path(path, instrument_type='sbe', **kwargs):
         logger.info(f'Unknown suffix for instrument_type: {path}')
         return False
     try:
-        obj = file_cls(path, **kwargs)
-        if not utils.is_matching(obj, **kwargs):
-            logger.debug(f'File not matching filter: {path}')
-            return None
-        return obj
+        return file_cls(path, **kwargs)
     except UnrecognizedFile:
         logger.warning(f'Suffix is known but still cant handle file: {path}')
         return False
 
 
-def get_packages_from_file_list(file_list, instrument_type='sbe', attributes=None, as_list=False, with_new_key=False, with_id_as_key=False, **kwargs):
+def _create_file_object_in_worker(args):
+    path, instrument_type, kwargs = args
+    return _create_file_object(path, instrument_type=instrument_type, **kwargs)
+
+
+def _get_file_objects_in_parallel(paths, instrument_type='sbe', workers=None, index=None, **kwargs):
+    """
+    Returns file objects for all paths (in the same order) using a process pool. Files found in index are not sent to
+    the workers. Workers return pickled file objects.
+    """
+    file_objects = [None] * len(paths)
+    to_parse = []
+    for i, path in enumerate(paths):
+        obj = index.get_file(path, instrument_type=instrument_type, **kwargs) if index else None
+        if not obj:
+            to_parse.append(i)
+        elif utils.is_matching(obj, **kwargs):
+            file_objects[i] = obj
+    if not to_parse:
+        return file_objects
+    logger.info(f'Parsing {len(to_parse)} files using {workers} workers')
+    chunksize = max(1, len(to_parse) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        args = [(paths[i], instrument_type, kwargs) for i in to_parse]
+        for i, obj in zip(to_parse, executor.map(_create_file_object_in_worker, args, chunksize=chunksize)):
+            # All parsed files are stored in the index, as in get_file_object_for_path
+            if obj and index:
+                index.add_file(obj, instrument_type=instrument_type, **kwargs)
+            if obj and not utils.is_matching(obj, **kwargs):
+                obj = None
+            file_objects[i] = obj
+    return file_objects
+
+
+def get_packages_from_file_list(file_list, instrument_type='sbe', attributes=None, as_list=False, with_new_key=False, with_id_as_key=False, index=None, workers=None, **kwargs):
+    """
+    Returns packages for the files in file_list. Files are parsed in a process pool with the given number of workers
+    if workers > 1.
+    """
     logger.debug('get_packages_from_file_list')
-    packages = {}
-    for path in file_list:
-        if isinstance(path, InstrumentFile):
-            file = path
-        else:
-            file = get_file_object_for_path(path, instrument_type=instrument_type, **kwargs)
-            if not file:  # or not utils.is_matching(file, **kwargs): This check is made in get_file_object_for_path
-                logger.debug(f'Could not create file object for path: {path}')
-                continue
-        PACK = PACKAGES.get(instrument_type)
-        pack = packages.setdefault(file.pattern, PACK(attributes=attributes, **kwargs))
+    index = get_file_index(index)
+    file_list = list(file_list)
+    if workers and workers > 1:
+        paths = [path for path in file_list if not isinstance(path, InstrumentFile)]
+        parsed = iter(_get_file_objects_in_parallel(paths, instrument_type=instrument_type, workers=workers,
+                                                    index=index, **kwargs))
+        file_objects = [path if isinstance(path, InstrumentFile) else next(parsed) for path in file_list]
+    else:
+        file_objects = [path if isinstance(path, InstrumentFile) else
+                        get_file_object_for_path(path, instrument_type=instrument_type, index=index, **kwargs)
+                        for path in file_list]
+    PACK = PACKAGES.get(instrument_type)
+    files_by_pattern = {}
+    for path, file in zip(file_list, file_objects):
+        if not file:  # or not utils.is_matching(file, **kwargs): This check is made in get_file_object_for_path
+            logger.debug(f'Could not create file object for path: {path}')
+            continue
         file.package_instrument_type = PACK.INSTRUMENT_TYPE
-        pack.add_file(file, **kwargs)
-    logger.info('Setting key in packages')
-    for pack in packages.values():
-        pack.set_key()
+        files_by_pattern.setdefault(file.pattern, []).append(file)
+    if index:
+        index.commit()
+    logger.info('Adding files and setting key in packages')
+    packages = {}
+    for pattern, files in files_by_pattern.items():
+        pack = PACK(attributes=attributes, **kwargs)
+        pack.add_files(files, **kwargs)
+        packages[pattern] = pack
     if as_list:
         packages = list(packages.values())
     elif with_new_key:
@@ -203,6 +358,46 @@ def get_packages_in_directory(directory, as_list=False, with_new_key=False, with
     return packages
 
 
+def iter_packages_in_directory(directory, group_depth=1, exclude_directory=None, **kwargs):
+    """
+    Yields packages in the directory tree while walking it. The files under each directory group_depth levels
+    below directory (e.g. the year directories of an archive) are packed and yielded as soon as that directory has
+    been walked, so only one group is held in memory. All files of a package must be in the same group. Directories
+    in FILE_TYPE_DIRECTORIES (raw, cnv, plots etc.) are grouped with their parent directory. Files in directories
+    above the groups are yielded last. With group_depth=0 all packages are yielded at the end.
+    """
+    logger.debug('iter_packages_in_directory')
+    root = Path(directory)
+    groups = {}
+    for sub_directory, paths in _iter_selected_paths_by_directory(root, exclude_directory=exclude_directory,
+                                                                  **kwargs):
+        parts = sub_directory.relative_to(root).parts
+        if len(parts) >= group_depth:
+            group = _get_group_parts(parts[:group_depth])
+        elif parts in groups:
+            # Parent of file type directories above group_depth
+            group = parts
+        else:
+            group = ()
+        groups.setdefault(group, []).extend(paths)
+        if group and group == parts:
+            # The walk is bottom-up, so this directory and everything below it is done
+            group_paths = groups.pop(group)
+            if group_paths:
+                yield from get_packages_from_file_list(group_paths, as_list=True, **kwargs)
+    remaining_paths = [path for paths in groups.values() for path in paths]
+    if remaining_paths:
+        yield from get_packages_from_file_list(remaining_paths, as_list=True, **kwargs)
+
+
+def _get_group_parts(parts):
+    """ Removes trailing FILE_TYPE_DIRECTORIES from the directory parts of a group """
+    parts = tuple(parts)
+    while parts and parts[-1].lower() in FILE_TYPE_DIRECTORIES:
+        parts = parts[:-1]
+    return parts
+
+
 def get_package_for_file(path, directory=None, exclude_directory=None, only_this_file=False, **kwargs):
     logger.info(f'get_package_for_file: {path}')
     if isinstance(path, InstrumentFile):
@@ -351,6 +546,15 @@ def get_package_collection_for_directory(directory, instrument_type='sbe', **kwa
     return PackageCollection(name=path.name, packages=packages)
 
 
+def get_live_package_collection_for_directory(directory, instrument_type='sbe', start=True, **kwargs):
+    """ Returns a LivePackageCollection for directory that is updated when files are created, changed or deleted """
+    from file_explorer.live_collection import LivePackageCollection
+    collection = LivePackageCollection(directory, instrument_type=instrument_type, **kwargs)
+    if start:
+        collection.start()
+    return collection
+
+
 def get_merged_package_collections_for_packages(packages, merge_on=None, as_list=False, **kwargs):
     logger.debug('get_merged_package_collections_for_packages')
     collections = {}
@@ -418,15 +622,23 @@ def edit_seabird_raw_files_in_package(pack,
     Edits metadata in hex and hrd files. Saves to new location 'output_dir'. Option to load metadata from
     sharkweb-file or lims-file
     """
-    for file in pack.get_raw_files():
-        if file.suffix in ['.hdr', '.hex', '.btl', '.ros', '.xml']:
-            header_form_file.update_header_form_file(file, output_directory=output_dir, overwrite_file=overwrite_files, **meta)
-        else:
-            target_path = pathlib.Path(output_dir, file.name)
-            if target_path.exists() and not overwrite_files:
-                raise FileExistsError(target_path)
-            shutil.copy2(file.path, target_path)
-    return get_package_for_key(pack.key, directory=output_dir)
+    output_paths = [_edit_seabird_raw_file(file, output_dir, overwrite_files, meta) for file in pack.get_raw_files()]
+    packages = get_packages_from_file_list(output_paths, as_list=True)
+    if not packages:
+        return None
+    return packages[0]
+
+
+def _edit_seabird_raw_file(file, output_dir, overwrite_files, meta):
+    """ Edits metadata in a raw file or copies it if it has no header form. Returns the path of the new file. """
+    if file.suffix in ['.hdr', '.hex', '.btl', '.ros', '.xml']:
+        return header_form_file.update_header_form_file(file, output_directory=output_dir,
+                                                        overwrite_file=overwrite_files, **meta).path
+    target_path = pathlib.Path(output_dir, file.name)
+    if target_path.exists() and not overwrite_files:
+        raise FileExistsError(target_path)
+    shutil.copy2(file.path, target_path)
+    return target_path
 
 
 def edit_seabird_raw_files_in_packages(packs,
@@ -437,10 +649,12 @@ def edit_seabird_raw_files_in_packages(packs,
                                        lims_file_path=None,
                                        overwrite_files=False,
                                        columns=None,
+                                       workers=None,
                                        **data):
     """
     Edits metadata in hex and hrd files. Saves to new location 'output_dir'. Option to load metadata from
-    sharkweb-file or lims-file
+    sharkweb-file or lims-file. Metadata for all packages is collected before the files are written in a thread
+    pool with the given number of workers.
     """
     fe_logger.reset_log()
     if not columns:
@@ -449,64 +663,68 @@ def edit_seabird_raw_files_in_packages(packs,
     lims_meta = {}
     if sharkweb_api:
         fe_logger.log_workflow('Downloading data from SHARKweb')
-        sharkweb_meta = dict()
         all_years = sorted(set([pack.year for pack in packs]))
-        file_paths = sharkweb.download_data_from_sharkweb(all_years[0], all_years[-1])
-        if file_paths is None:
+        sharkweb_meta = sharkweb.get_metadata_from_sharkweb(all_years[0], all_years[-1], columns=columns)
+        if not sharkweb_meta:
             fe_logger.log_workflow(f'Could not download data from SHARKweb')
-        else:
-            for path in file_paths:
-                meta = sharkweb.get_metadata_from_sharkweb_btl_data(path, columns=columns, encoding='utf8')
-                sharkweb_meta.update(meta)
     if sharkweb_file_path:
         sharkweb_meta.update(sharkweb.get_metadata_from_sharkweb_btl_data(sharkweb_file_path, columns=columns, encoding='utf8'))
     if lims_file_path:
         lims_meta = lims.get_metadata_from_lims_export_file(lims_file_path, columns=columns)
-    new_packs = []
-    for pack in packs:
-        meta = {}
-
-        if from_svepa and svepa_event:
-            # event = svepa_event.get_svepa_event('ctd', pack.datetime)
-            event = _get_ctd_svepa_event_for_time(pack.datetime)
-            # event = svepa.get_svepa_event('ctd', pack.datetime)
-            if event:
-                if hasattr(event, 'event_id'):
-                    meta['event_id'] = event.event_id
-                if hasattr(event, 'parent_event_id'):
-                    meta['parent_event_id'] = event.parent_event_id
-                if hasattr(event, 'ongoing_event_names'):
-                    meta['Additional Sampling'] = ', '.join(event.ongoing_event_names)
-                if hasattr(event, 'air_pres'):
-                    meta['AIRPRES'] = event.air_pres
-                if hasattr(event, 'air_temp'):
-                    meta['AIRTEMP'] = event.air_temp
-                if hasattr(event, 'wind_dir'):
-                    meta['WINDIR'] = event.wind_dir
-                if hasattr(event, 'wind_speed'):
-                    meta['WINSP'] = event.wind_speed
-                fe_logger.debug(f'Metadata after svepa: {meta}')
-
-        fe_logger.debug(f'svepa_event: {meta=}')
-        fe_logger.debug(f'{pack.short_key=}')
-        meta.update(sharkweb_meta.get(pack.short_key, {}))
-        fe_logger.debug(f'sharkweb: {meta=}')
-        fe_logger.debug(f'Metadata after sharkweb: {meta}')
-        meta.update(lims_meta.get(pack.short_key, {}))
-        fe_logger.debug(f'lims: {meta=}')
-        fe_logger.debug(f'Metadata after lims: {meta}')
-        meta.update(data)
-        fe_logger.debug(f'Metadata after "manuel meta": {meta}')
-        fe_logger.debug(f'kwargs: {meta=}')
-
-        meta = _strip_metadata_keys(meta)
-
-        new_pack = edit_seabird_raw_files_in_package(pack,
-                                                     output_dir=output_dir,
-                                                     overwrite_files=overwrite_files,
-                                                     **meta)
-        new_packs.append(new_pack)
-    return new_packs
+    metas = [_get_metadata_for_package(pack, from_svepa=from_svepa, sharkweb_meta=sharkweb_meta,
+                                       lims_meta=lims_meta, **data) for pack in packs]
+
+    # Files are written in parallel. Packages are created from the written files so output_dir is never scanned.
+    tasks = [(pack, file, meta) for pack, meta in zip(packs, metas) for file in pack.get_raw_files()]
+    output_paths = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(pack, executor.submit(_edit_seabird_raw_file, file, output_dir, overwrite_files, meta))
+                   for pack, file, meta in tasks]
+        for pack, future in futures:
+            output_paths.setdefault(id(pack), []).append(future.result())
+    all_paths = [path for paths in output_paths.values() for path in paths]
+    new_packs_by_pattern = get_packages_from_file_list(all_paths)
+    return [new_packs_by_pattern.get(pack.pattern) for pack in packs]
+
+
+def _get_metadata_for_package(pack, from_svepa=False, sharkweb_meta=None, lims_meta=None, **data):
+    meta = {}
+
+    if from_svepa and svepa_event:
+        # event = svepa_event.get_svepa_event('ctd', pack.datetime)
+        event = _get_ctd_svepa_event_for_time(pack.datetime)
+        # event = svepa.get_svepa_event('ctd', pack.datetime)
+        if event:
+            if hasattr(event, 'event_id'):
+                meta['event_id'] = event.event_id
+            if hasattr(event, 'parent_event_id'):
+                meta['parent_event_id'] = event.parent_event_id
+            if hasattr(event, 'ongoing_event_names'):
+                meta['Additional Sampling'] = ', '.join(event.ongoing_event_names)
+            if hasattr(event, 'air_pres'):
+                meta['AIRPRES'] = event.air_pres
+            if hasattr(event, 'air_temp'):
+                meta['AIRTEMP'] = event.air_temp
+            if hasattr(event, 'wind_dir'):
+                meta['WINDIR'] = event.wind_dir
+            if hasattr(event, 'wind_speed'):
+                meta['WINSP'] = event.wind_speed
+            fe_logger.debug(f'Metadata after svepa: {meta}')
+
+    fe_logger.debug(f'svepa_event: {meta=}')
+    fe_logger.debug(f'{pack.short_key=}')
+    meta.update((sharkweb_meta or {}).get(pack.short_key, {}))
+    fe_logger.debug(f'sharkweb: {meta=}')
+    fe_logger.debug(f'Metadata after sharkweb: {meta}')
+    meta.update((lims_meta or {}).get(pack.short_key, {}))
+    fe_logger.debug(f'lims: {meta=}')
+    fe_logger.debug(f'Metadata after lims: {meta}')
+    meta.update(data)
+    fe_logger.debug(f'Metadata after "manuel meta": {meta}')
+    fe_logger.debug(f'kwargs: {meta=}')
+
+    return _strip_metadata_keys(meta)
+
 
 def _get_ctd_svepa_event_for_time(time: datetime.datetime):
     print(f'{time=}')
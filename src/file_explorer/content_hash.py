@@ -0,0 +1,106 @@
+import hashlib
+import logging
+import os
+import pathlib
+import threading
+import zlib
+
+from file_explorer.file_index import get_file_index
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_CACHE_SIZE = 100_000
+
+try:
+    import xxhash
+    # Fast non-cryptographic hash used for equality checks if xxhash is installed
+    EQUALITY_ALGORITHM = 'xxh3_64'
+except ImportError:
+    xxhash = None
+    EQUALITY_ALGORITHM = 'md5'
+
+XXHASH_ALGORITHMS = ['xxh32', 'xxh64', 'xxh3_64', 'xxh3_128', 'xxh128']
+
+_cache = {}
+_lock = threading.Lock()
+
+
+class _Crc32:
+    """ zlib.crc32 with the interface of the hashlib objects """
+
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data):
+        self._value = zlib.crc32(data, self._value)
+
+    def hexdigest(self):
+        return f'{self._value:08x}'
+
+
+def _get_hasher(algorithm):
+    if algorithm == 'crc32':
+        return _Crc32()
+    if algorithm in XXHASH_ALGORITHMS:
+        if not xxhash:
+            raise ImportError(f'xxhash is needed for hash algorithm {algorithm}. Install with: pip install xxhash')
+        return getattr(xxhash, algorithm)()
+    return hashlib.new(algorithm)
+
+
+def _get_cache_key(path, stat, algorithm):
+    # Files are identified by device and inode if available so that the hash is shared between paths to the same file
+    if stat.st_ino:
+        identity = (stat.st_dev, stat.st_ino)
+    else:
+        identity = str(pathlib.Path(path).absolute())
+    return identity, stat.st_size, stat.st_mtime_ns, algorithm
+
+
+def compute_content_hash(path, algorithm='md5', chunk_size=HASH_CHUNK_SIZE):
+    """ Returns the hash of the file content. The file is read in chunks of chunk_size bytes. """
+    hasher = _get_hasher(algorithm)
+    with open(path, 'rb') as fid:
+        for chunk in iter(lambda: fid.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_content_hash(path, algorithm='md5', index=None):
+    """
+    Returns the hash of the file content. Hashes are cached in memory for as long as inode, size and modification
+    time of the file are unchanged. If index is given (see file_index.get_file_index) hashes are also stored there
+    so that they are kept between sessions.
+    """
+    stat = os.stat(path)
+    key = _get_cache_key(path, stat, algorithm)
+    with _lock:
+        content_hash = _cache.get(key)
+    if content_hash:
+        return content_hash
+    index = get_file_index(index)
+    if index:
+        content_hash = index.get_content_hash(path, algorithm, stat=stat)
+    if not content_hash:
+        content_hash = compute_content_hash(path, algorithm)
+        if index:
+            index.add_content_hash(path, algorithm, content_hash, stat=stat)
+    with _lock:
+        if len(_cache) >= MAX_CACHE_SIZE:
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = content_hash
+    return content_hash
+
+
+def files_have_same_content(path, other_path, algorithm=None, index=None):
+    """ Returns True if the files have the same content. Files with different size are not read. """
+    if os.path.getsize(path) != os.path.getsize(other_path):
+        return False
+    algorithm = algorithm or EQUALITY_ALGORITHM
+    return get_content_hash(path, algorithm, index=index) == get_content_hash(other_path, algorithm, index=index)
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -1,43 +1,89 @@
+import collections
 import datetime
-import hashlib
+import functools
 from abc import ABC, abstractmethod
 from pathlib import Path
 import logging
 import xml
 
+from file_explorer import content_hash
 from file_explorer import mapping
 from file_explorer import utils
 from file_explorer.patterns import get_file_name_match
 
 logger = logging.getLogger(__name__)
 
+# Attributes derived from the file path. Asking for these does not read a file created with lazy=True. Groups in the
+# file name pattern of the file are also derived from the path, see InstrumentFile.is_path_attribute.
+PATH_ATTRIBUTES = {'suffix', 'path', 'name'}
+
+# Groups that only exist in some file name patterns and are never read from a file. A file name matching a pattern
+# without the group has no value.
+FILE_NAME_ONLY_ATTRIBUTES = {'test'}
+
+# Derived from the file path unless the file class reads the time from the file (overrides _get_datetime). That is
+# the case for HdrFile, HexFile, CnvFile, TxtFile, PrsFile and OdvFile.
+DATETIME_ATTRIBUTES = {'datetime', 'date', 'time'}
+
+# Attributes that are unique for every file. Their values are not interned.
+UNIQUE_ATTRIBUTES = {'path', 'name'}
+
+
+@functools.lru_cache(maxsize=None)
+def get_slot_names(cls):
+    """ Returns the names in __slots__ of cls and all its base classes """
+    return frozenset(name for klass in cls.__mro__ for name in vars(klass).get('__slots__', ()))
+
+
+@functools.lru_cache(maxsize=None)
+def get_slot_defaults(cls):
+    """ Returns the initial values of the slots of cls. Subclasses override the values of their base classes. """
+    defaults = {}
+    for klass in reversed(cls.__mro__):
+        defaults.update(vars(klass).get('_slot_defaults', {}))
+    return defaults
+
 
 class InstrumentFile(ABC):
+    # There can be millions of files in an archive so instance attributes are stored in __slots__ instead of in a
+    # __dict__. Subclasses list their own instance attributes in __slots__ and give initial values in _slot_defaults.
+    __slots__ = ('_path', 'ignore_pattern', '_key', '_path_info', '_attributes', '_file_loaded', '_lazy', '_loading',
+                 '_no_datetime_from_file_name', '_lines', '_data_object', 'name_match', 'package_instrument_type',
+                 'encoding', 'edit_mode')
+    _slot_defaults = {
+        '_lines': None,
+        '_lazy': False,
+        '_loading': False,
+        '_data_object': None,
+        'name_match': None,
+        'package_instrument_type': None,
+    }
     suffix = None
-    _path_info = {}
-    _attributes = {}
-    _lines = None
-    package_instrument_type = None
-    encoding = 'cp1252'
+    default_encoding = 'cp1252'
 
     def __init__(self, path, ignore_pattern=False, **kwargs):
+        self._set_slot_defaults()
         self._path = Path(path)
         self.ignore_pattern = ignore_pattern
         self._key = None
         self._path_info = {}
         self._attributes = {}
         self._file_loaded = False
+        self._lazy = kwargs.get('lazy', False)
         self._no_datetime_from_file_name = kwargs.pop('no_datetime_from_file_name', False)
 
         encoding_key = f'{self.suffix[1:]}_encoding'
-        self.encoding = kwargs.get(encoding_key) or self.encoding
+        self.encoding = kwargs.get(encoding_key) or self.default_encoding
 
         self.edit_mode = kwargs.get('edit_mode', False)
 
         try:
             self._load_file()
             self._fixup()
-            if kwargs.get('load_file', True):
+            self._path_info = utils.get_compact_dict(self._path_info)
+            if self._lazy:
+                self._save_path_attributes()
+            elif kwargs.get('load_file', True):
                 self.save_info_from_file()
             else:
                 self._attributes.update(self._path_info)
@@ -47,14 +93,42 @@ class InstrumentFile(ABC):
                 # self._attributes['cruise'] = '00'
                 self._save_attributes()
                 self._add_and_map_attributes()
+                self._compact_attributes()
         except xml.etree.ElementTree.ParseError as e:
             logger.error(f'Could not parse xml in file: {self.path}\n{e}')
             raise
 
+    def _set_slot_defaults(self):
+        for name, value in get_slot_defaults(type(self)).items():
+            setattr(self, name, value)
+
+    def _compact_attributes(self):
+        # Attribute names and many values are the same in all files. Interning them keeps one copy in memory.
+        # Values equal to the ones derived from the file path are only kept in _path_info (see current_attributes).
+        attributes = {key: value for key, value in self._attributes.items()
+                      if key not in self._path_info or self._path_info[key] != value}
+        self._attributes = utils.get_compact_dict(attributes, unique_keys=UNIQUE_ATTRIBUTES)
+
+    def _save_path_attributes(self):
+        """ Saves the attributes that can be derived from the file path without reading the file """
+        self._attributes.update(self._path_info)
+        self._attributes['suffix'] = self.suffix
+        self._attributes['path'] = str(self.path)
+        self._attributes['name'] = self.name
+        datetime_from_path = self._get_datetime_from_path()
+        self._attributes['datetime'] = datetime_from_path
+        if datetime_from_path:
+            self._attributes['date'] = datetime_from_path.strftime('%Y-%m-%d')
+            self._attributes['time'] = datetime_from_path.strftime('%H:%M')
+        self._compact_attributes()
+
     def save_info_from_file(self):
-        if self._file_loaded:
+        if self._file_loaded or self._loading:
             return
+        self._loading = True
         try:
+            if self._lazy:
+                self._attributes = {}
             self._save_info_from_file()
 
             self._attributes.update(self._path_info)
@@ -64,11 +138,42 @@ class InstrumentFile(ABC):
             # self._attributes['cruise'] = '00'
             self._save_attributes()
             self._add_and_map_attributes()
+            self._compact_attributes()
             self._file_loaded = True
         except xml.etree.ElementTree.ParseError as e:
             logger.error(f'Could not parse xml in file: {self.path}\n{e}')
             print(self.path)
             raise
+        finally:
+            self._loading = False
+
+    @property
+    def is_loaded(self):
+        """ False if the file was created with lazy=True and information has not yet been read from the file """
+        return not self._lazy or self._file_loaded
+
+    def load_for_keys(self, *keys):
+        """
+        Reads information from the file (lazy mode) if any of the given keys can not be derived from the file path.
+        Returns True if the file was read.
+        """
+        if self.is_loaded or self._loading:
+            return False
+        for key in keys:
+            if self.is_path_attribute(key):
+                continue
+            self.save_info_from_file()
+            return True
+        return False
+
+    def is_path_attribute(self, key):
+        """ True if the value of key is derived from the file path and does not change when the file is read """
+        key = key.lower()
+        if key.startswith('_') or key in PATH_ATTRIBUTES or key in FILE_NAME_ONLY_ATTRIBUTES:
+            return True
+        if key in DATETIME_ATTRIBUTES:
+            return type(self)._get_datetime is InstrumentFile._get_datetime
+        return key in self._path_info
 
     def _get_datetime(self):
         # Overwrite this in subclasses if needed
@@ -101,17 +206,46 @@ class InstrumentFile(ABC):
         if not utils.is_matching(self, **kwargs):
             return
         else:
+            self.load_for_keys(*keys)
             if len(keys) == 1:
-                return self.attributes.get(keys[0].lower(), False)
-            return tuple([self.attributes.get(key.lower(), False) for key in keys])
+                return self._get_attribute(keys[0])
+            return tuple([self._get_attribute(key) for key in keys])
+
+    def _get_attribute(self, key):
+        key = key.lower()
+        if key in self._attributes:
+            return self._attributes[key]
+        return self._path_info.get(key, False)
 
     def __getattr__(self, item):
+        if item.startswith('__') or item in get_slot_names(type(self)):
+            # Special methods looked up by copy, pickle etc. and slots that are not set
+            raise AttributeError(item)
         return self(item)
 
+    def __getstate__(self):
+        # Match objects can not be pickled and loaded data is not stored. name_match is restored in __setstate__
+        state = {name: getattr(self, name) for name in get_slot_names(type(self)) if hasattr(self, name)}
+        state.update(getattr(self, '__dict__', {}))
+        state.pop('name_match', None)
+        state.pop('_data_object', None)
+        return state
+
+    def __setstate__(self, state):
+        self._set_slot_defaults()
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._path_info = utils.get_compact_dict(self._path_info)
+        self._compact_attributes()
+        name_match = get_file_name_match(self.path.name)
+        if name_match:
+            self.name_match = name_match
+
     def __eq__(self, other):
-        if self.md5 == other.md5:
-            return True
-        return False
+        other_path = getattr(other, 'path', None)
+        if not other_path:
+            return False
+        return content_hash.files_have_same_content(self.path, other_path)
 
     @property
     def lines(self):
@@ -169,12 +303,23 @@ class InstrumentFile(ABC):
 
     @property
     def attributes(self):
-        return self._attributes
+        if not self.is_loaded:
+            self.save_info_from_file()
+        return self.current_attributes
+
+    @property
+    def current_attributes(self):
+        """ The attributes available without reading the file. Same as attributes if the file is loaded.
+        Values derived from the file path are only stored in _path_info and are looked up through the ChainMap. """
+        return collections.ChainMap(self._attributes, self._path_info)
 
     @property
     def md5(self):
-        with open(self.path, 'rb') as fid:
-            return hashlib.md5(fid.read()).hexdigest()
+        return self.content_hash('md5')
+
+    def content_hash(self, algorithm='md5', index=None):
+        """ Returns a cached hash of the file content. See content_hash.get_content_hash """
+        return content_hash.get_content_hash(self.path, algorithm, index=index)
 
     def _load_file(self):
         if self.path.suffix.lower() != self.suffix.lower():
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 
 class DataFile(ABC):
+    __slots__ = ()
     _data_object = None
 
     def get_data_object(self, **kwargs):
@@ -2,6 +2,7 @@
 from pathlib import Path
 import shutil
 import filecmp
+import hashlib
 import pathlib
 import datetime
 import os
@@ -9,7 +10,9 @@ import os
 from ctd_processing import exceptions
 
 import file_explorer
+from file_explorer import utils
 from file_explorer.file_handler import FileHandler
+from file_explorer.file_handler import sync
 from file_explorer import get_file_object_for_path
 
 import logging
@@ -282,7 +285,7 @@ class SBEFileHandler(FileHandler):
             local = self.local_files.get(key)
             if not local:
                 continue
-            if local == server:
+            if sync.files_are_equal(local.path, server.path):
                 continue
             result[key] = local
         return result
@@ -297,22 +300,30 @@ class SBEFileHandler(FileHandler):
     #     print(f'{self._all_local_files_by_directory.keys()=}')
     #     return self._all_local_files_by_directory.get(directory, [])
 
-    def copy_files_to_server(self, update=False):
-        for key, path_obj in self._not_on_server().items():
+    def copy_files_to_server(self, update=False, workers=sync.DEFAULT_WORKERS, use_manifest=False):
+        """
+        Copies local files that are not on server. If update is True, files that differ from the server version are
+        replaced. Files are copied concurrently and renamed on server when complete. An interrupted copy is cleaned up
+        the next time this method is called. Returns a dict with lists of copied, skipped and failed server paths.
+        """
+        pairs = []
+        sub_keys = self.get_sub_keys('server')
+        for key, path_obj in self.local_files.items():
             sub, name = key
+            if sub not in sub_keys:
+                continue
+            if self.server_files.get(key) and not update:
+                continue
             server_directory = self.get_dir('server', sub)
             if not server_directory:
                 continue
-            target_path = Path(server_directory, path_obj.name)
-            shutil.copy2(path_obj.path, target_path)
-        if update:
-            for key, path_obj in self._not_updated_on_server().items():
-                sub, name = key
-                server_directory = self.get_dir('server', sub)
-                if not server_directory:
-                    continue
-                target_path = Path(server_directory, path_obj.name)
-                shutil.copy2(path_obj.path, target_path)
+            pairs.append((path_obj.path, Path(server_directory, path_obj.name)))
+        return sync.sync_files(pairs, update=update, workers=workers, use_manifest=use_manifest,
+                               journal=self._get_sync_journal_path())
+
+    def _get_sync_journal_path(self):
+        name = hashlib.md5(str(self.get_root_dir('server')).encode()).hexdigest()
+        return Path(utils.get_temp_directory('sync'), f'{name}.journal')
 
     # def get_local_file_path(self, subdir=None, suffix=None):
     #     paths = []
@@ -0,0 +1,214 @@
+import concurrent.futures
+import filecmp
+import json
+import logging
+import os
+import pathlib
+import shutil
+import threading
+
+from file_explorer import content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+MANIFEST_FILE_NAME = '.file_explorer_manifest.json'
+TEMP_SUFFIX = '.part'
+
+# Modification times are only kept with this precision on some file systems (FAT, some SMB shares). See files_are_equal
+MTIME_TOLERANCE = 2
+
+
+def get_file_hash(path):
+    """ Returns the md5 hash of the file content. Uses the cache in content_hash (see content_hash.get_content_hash)
+    so files that are already hashed are not read again. """
+    return content_hash.get_content_hash(path, 'md5')
+
+
+class HashManifest:
+    """
+    Hashes of the files in a directory stored in a json file in the directory. An entry is valid as long as size and
+    modification time of the file are unchanged, so the file does not have to be read (e.g. over a network share)
+    to be compared.
+    """
+
+    def __init__(self, directory):
+        self._path = pathlib.Path(directory, MANIFEST_FILE_NAME)
+        self._lock = threading.Lock()
+        self._data = {}
+        if self._path.exists():
+            try:
+                with open(self._path) as fid:
+                    self._data = json.load(fid)
+            except (ValueError, OSError) as e:
+                logger.warning(f'Could not read hash manifest {self._path}: {e}')
+
+    @property
+    def path(self):
+        return self._path
+
+    def get_hash(self, path):
+        path = pathlib.Path(path)
+        stat = path.stat()
+        with self._lock:
+            entry = self._data.get(path.name)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['md5']
+        md5 = get_file_hash(path)
+        self.set_hash(path, md5)
+        return md5
+
+    def set_hash(self, path, md5):
+        path = pathlib.Path(path)
+        stat = path.stat()
+        with self._lock:
+            self._data[path.name] = dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns, md5=md5)
+
+    def save(self):
+        with self._lock:
+            _write_text_atomic(self._path, json.dumps(self._data, indent=0))
+
+
+class SyncJournal:
+    """
+    Journal of started and finished copies. If a sync is interrupted, temporary files of unfinished copies are
+    removed when the journal is opened again. The journal file is removed when a sync finishes without errors.
+    """
+
+    def __init__(self, path):
+        self._path = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def path(self):
+        return self._path
+
+    def get_unfinished(self):
+        """ Returns the target paths of copies that were started but not finished """
+        if not self._path.exists():
+            return []
+        started = {}
+        with open(self._path, encoding='utf8') as fid:
+            for line in fid:
+                status, _, target = line.rstrip('\n').partition('\t')
+                if status == 'started':
+                    started[target] = True
+                elif status == 'done':
+                    started.pop(target, None)
+        return [pathlib.Path(target) for target in started]
+
+    def clean_up(self):
+        """ Removes temporary files from unfinished copies """
+        for target in self.get_unfinished():
+            temp_path = _get_temp_path(target)
+            if temp_path.exists():
+                logger.info(f'Removing temporary file from interrupted copy: {temp_path}')
+                temp_path.unlink()
+
+    def add(self, status, target):
+        with self._lock:
+            with open(self._path, 'a', encoding='utf8') as fid:
+                fid.write(f'{status}\t{target}\n')
+
+    def close(self, remove=True):
+        if remove and self._path.exists():
+            self._path.unlink()
+
+
+def _get_temp_path(target):
+    target = pathlib.Path(target)
+    return target.with_name(f'{target.name}{TEMP_SUFFIX}')
+
+
+def _write_text_atomic(path, text):
+    temp_path = _get_temp_path(path)
+    with open(temp_path, 'w') as fid:
+        fid.write(text)
+    os.replace(temp_path, path)
+
+
+def copy_file_atomic(source, target):
+    """ Copies source to a temporary file next to target and renames it to target when complete """
+    target = pathlib.Path(target)
+    temp_path = _get_temp_path(target)
+    shutil.copy2(source, temp_path)
+    os.replace(temp_path, target)
+
+
+def files_are_equal(source, target, manifest=None, mtime_tolerance=None):
+    """
+    Returns True if target has the same content as source. Files with different size are different. Otherwise the
+    content is compared, using hashes if a HashManifest for the target directory is given.
+    If mtime_tolerance (seconds) is given, files with the same size and modification times within the tolerance are
+    considered equal without reading them (the quick check made by e.g. rsync). This is only safe if the targets are
+    written by sync_files, which keeps the modification time of the source. Use MTIME_TOLERANCE for file systems that
+    store modification times with two seconds precision (FAT, some SMB shares).
+    """
+    source = pathlib.Path(source)
+    target = pathlib.Path(target)
+    try:
+        target_stat = target.stat()
+    except FileNotFoundError:
+        return False
+    source_stat = source.stat()
+    if source_stat.st_size != target_stat.st_size:
+        return False
+    if mtime_tolerance is not None and abs(source_stat.st_mtime - target_stat.st_mtime) <= mtime_tolerance:
+        return True
+    if manifest:
+        return get_file_hash(source) == manifest.get_hash(target)
+    return filecmp.cmp(source, target, shallow=False)
+
+
+def sync_files(pairs, update=True, workers=DEFAULT_WORKERS, use_manifest=False, journal=None, mtime_tolerance=None):
+    """
+    Copies files given as (source, target) pairs using a thread pool. Targets that exist are only replaced if update
+    is True and the content differs (see files_are_equal, also for mtime_tolerance). Every copy is made to a temporary
+    file that is renamed when complete. If journal (a path or SyncJournal) is given, temporary files from an interrupted sync are removed
+    first. If use_manifest is True, hashes of the targets are kept in a HashManifest in each target directory.
+    Returns a dict with lists of copied, skipped and failed targets.
+    """
+    if journal and not isinstance(journal, SyncJournal):
+        journal = SyncJournal(journal)
+    if journal:
+        journal.clean_up()
+    manifests = {}
+    if use_manifest:
+        for _, target in pairs:
+            directory = pathlib.Path(target).parent
+            if directory not in manifests and directory.exists():
+                manifests[directory] = HashManifest(directory)
+
+    def _sync(source, target):
+        source = pathlib.Path(source)
+        target = pathlib.Path(target)
+        manifest = manifests.get(target.parent)
+        if target.exists() and (not update or files_are_equal(source, target, manifest=manifest,
+                                                              mtime_tolerance=mtime_tolerance)):
+            return 'skipped'
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if journal:
+            journal.add('started', target)
+        copy_file_atomic(source, target)
+        if journal:
+            journal.add('done', target)
+        if manifest:
+            manifest.set_hash(target, get_file_hash(source))
+        return 'copied'
+
+    result = dict(copied=[], skipped=[], failed=[])
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = dict((executor.submit(_sync, source, target), pathlib.Path(target)) for source, target in pairs)
+        for future in concurrent.futures.as_completed(futures):
+            target = futures[future]
+            try:
+                result[future.result()].append(target)
+            except Exception as e:
+                logger.error(f'Could not copy file to {target}: {e}')
+                result['failed'].append(target)
+    for manifest in manifests.values():
+        manifest.save()
+    if journal:
+        journal.close(remove=not result['failed'])
+    return result
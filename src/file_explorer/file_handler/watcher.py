@@ -1,3 +1,4 @@
+import concurrent.futures
 import time
 import threading
 from watchdog.observers import Observer
@@ -21,12 +22,121 @@ def _add_watch_of_folder(_id: str, func):
     watch_subscribers[_id].append(func)
 
 
+def _remove_watch_of_folder(_id: str, func):
+    if func in watch_subscribers.get(_id, []):
+        watch_subscribers[_id].remove(func)
+
+
+# Seconds without new events for a path before the event for the path is dispatched
+DEFAULT_DEBOUNCE_WINDOW = 1.0
+DEFAULT_DISPATCH_WORKERS = 4
+
+# Event types that are dispatched. closed (after writing) is dispatched as modified.
+EVENT_TYPE_MAPPING = {
+    'created': 'created',
+    'modified': 'modified',
+    'closed': 'modified',
+    'deleted': 'deleted',
+}
+
+
+def _get_coalesced_event_type(previous, event_type):
+    """ Returns the event type for a path that had event previous followed by event_type. None if nothing changed. """
+    if not previous:
+        return event_type
+    if event_type == 'created':
+        return 'modified' if previous == 'deleted' else 'created'
+    if event_type == 'modified':
+        return 'created' if previous == 'created' else 'modified'
+    if event_type == 'deleted':
+        return None if previous == 'created' else 'deleted'
+    return event_type
+
+
+class EventBatcher:
+    """
+    Collects file events and dispatches one event per path when no new event has arrived for the path within window
+    seconds. Moves are handled as deleted + created. Events are dispatched in single thread workers chosen by path,
+    so events for one path arrive in order while slow callbacks for other paths (and the observer) are not blocked.
+    """
+
+    def __init__(self, _id, window=DEFAULT_DEBOUNCE_WINDOW, workers=DEFAULT_DISPATCH_WORKERS, dispatch=None):
+        self._id = _id
+        self._window = window
+        self._dispatch = dispatch or _trigger_folder_updated
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._executors = [concurrent.futures.ThreadPoolExecutor(max_workers=1) for _ in range(max(1, workers))]
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, data):
+        event_type = EVENT_TYPE_MAPPING.get(data['event_type'])
+        if not event_type:
+            return
+        path = data['src_path']
+        with self._condition:
+            previous = self._pending.get(path)
+            event_type = _get_coalesced_event_type(previous and previous[0]['event_type'], event_type)
+            if not event_type:
+                self._pending.pop(path, None)
+                return
+            self._pending[path] = dict(data, event_type=event_type), time.monotonic()
+            self._condition.notify()
+
+    def _run(self):
+        with self._condition:
+            while not self._stopped:
+                timeout = self._dispatch_settled()
+                self._condition.wait(timeout)
+
+    def _dispatch_settled(self, force=False):
+        """ Dispatches settled events. Returns the time until the next pending event settles. """
+        now = time.monotonic()
+        timeout = None
+        for path, (data, last_time) in list(self._pending.items()):
+            remaining = last_time + self._window - now
+            if remaining > 0 and not force:
+                timeout = remaining if timeout is None else min(timeout, remaining)
+                continue
+            self._pending.pop(path)
+            executor = self._executors[hash(path) % len(self._executors)]
+            executor.submit(self._dispatch_event, data)
+        return timeout
+
+    def _dispatch_event(self, data):
+        try:
+            self._dispatch(_id=self._id, data=data)
+        except Exception:
+            logger.exception(f'Error in callback for watcher {self._id}: {data.get("src_path")}')
+
+    def flush(self):
+        """ Dispatches all pending events without waiting for them to settle """
+        with self._condition:
+            self._dispatch_settled(force=True)
+
+    def stop(self):
+        """ Dispatches pending events and waits for all callbacks to finish """
+        with self._condition:
+            self._dispatch_settled(force=True)
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+
+
 class Watcher:
 
-    def __init__(self, watch_directory, _id):
+    def __init__(self, watch_directory, _id, window=DEFAULT_DEBOUNCE_WINDOW, workers=DEFAULT_DISPATCH_WORKERS):
         self._directory = watch_directory
         self._id = _id
-        self._observer = Observer()
+        self._window = window
+        self._workers = workers
+        self._observer = None
+        self._batcher = None
+        self._stop_event = threading.Event()
 
         self._thread = None
 
@@ -34,31 +144,36 @@ class Watcher:
         if self._thread:
             logger.warning(f'Thread for watcher {self._id} is already running!')
             return 
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     def _run(self):
-        event_handler = EventHandler(_id=self._id)
+        self._batcher = EventBatcher(self._id, window=self._window, workers=self._workers)
+        event_handler = EventHandler(_id=self._id, batcher=self._batcher)
+        self._observer = Observer()
         self._observer.schedule(event_handler, self._directory, recursive=True)
         self._observer.start()
-        try:
-            while True:
-                time.sleep(1)
-        except:
-            self._observer.stop()
-            print("Observer Stopped")
-
+        self._stop_event.wait()
+        self._observer.stop()
         self._observer.join()
+        self._batcher.stop()
+        print("Observer Stopped")
 
     def stop(self):
+        if not self._thread:
+            return
+        self._stop_event.set()
         self._thread.join()
         self._thread = None
 
 
 class EventHandler(FileSystemEventHandler):
+    """ Sends file events to the subscribers of _id. Events go through batcher (an EventBatcher) if given. """
 
-    def __init__(self, _id):
+    def __init__(self, _id, batcher=None):
         self._id = _id
+        self._batcher = batcher
 
     def on_any_event(self, event):
         if event.is_directory:
@@ -72,13 +187,18 @@ class EventHandler(FileSystemEventHandler):
         )
         if event.event_type == 'moved':
             data['dest_path'] = pathlib.Path(event.dest_path)
-        _trigger_folder_updated(_id=self._id, data=data)
+        if not self._batcher:
+            _trigger_folder_updated(_id=self._id, data=data)
+        elif event.event_type == 'moved':
+            self._batcher.add(dict(data, event_type='deleted', dest_path=None))
+            self._batcher.add(dict(data, event_type='created', src_path=data['dest_path'], dest_path=None))
+        else:
+            self._batcher.add(data)
 
 
-def keep_watch_of_folder(folder=None, id=None, func=None):
+def keep_watch_of_folder(folder=None, id=None, func=None, window=DEFAULT_DEBOUNCE_WINDOW,
+                         workers=DEFAULT_DISPATCH_WORKERS):
     _add_watch_of_folder(id, func)
-    watcher = Watcher(folder, id)
+    watcher = Watcher(folder, id, window=window, workers=workers)
     watcher.run()
     return watcher
-
-
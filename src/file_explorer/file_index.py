@@ -0,0 +1,181 @@
+import logging
+import os
+import pathlib
+import pickle
+import sqlite3
+import threading
+
+from file_explorer import utils
+
+logger = logging.getLogger(__name__)
+
+# Increase when the stored state of InstrumentFile objects changes. Entries with another version are re-parsed.
+FILE_INDEX_VERSION = 3
+
+INDEX_FILE_NAME = 'file_index.sqlite'
+
+# Keyword arguments that change how a file object is created. They are part of the index key.
+OPTION_KEYS = ['ignore_pattern', 'no_datetime_from_file_name', 'load_file', 'lazy', 'edit_mode']
+
+_default_index = None
+
+
+def get_default_index_path() -> pathlib.Path:
+    return pathlib.Path(utils.get_root_directory('index'), INDEX_FILE_NAME)
+
+
+def get_file_index(index=None):
+    """ Returns a FileIndex for the given index argument. index can be a FileIndex, a path or True for the default
+    index. Returns None if index is not given. """
+    global _default_index
+    if not index:
+        return None
+    if isinstance(index, FileIndex):
+        return index
+    if index is True:
+        if _default_index is None:
+            _default_index = FileIndex()
+        return _default_index
+    return FileIndex(index)
+
+
+def get_options_key(**kwargs) -> str:
+    options = sorted((key, kwargs[key]) for key in kwargs if key in OPTION_KEYS or key.endswith('_encoding'))
+    return repr(options)
+
+
+class FileIndex:
+    """
+    Persistent index of parsed InstrumentFile objects stored in a SQLite database.
+    Entries are keyed by path, instrument_type and creation options and are only valid as long as size and
+    modification time of the file are unchanged.
+    """
+
+    def __init__(self, path=None):
+        self._path = pathlib.Path(path) if path else get_default_index_path()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        self._create_table()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self._path}'
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self._path
+
+    def _create_table(self):
+        with self._lock:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS files ('
+                                     'path TEXT, '
+                                     'instrument_type TEXT, '
+                                     'options TEXT, '
+                                     'size INTEGER, '
+                                     'mtime INTEGER, '
+                                     'version INTEGER, '
+                                     'state BLOB, '
+                                     'PRIMARY KEY (path, instrument_type, options))')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS content_hashes ('
+                                     'path TEXT, '
+                                     'algorithm TEXT, '
+                                     'size INTEGER, '
+                                     'mtime INTEGER, '
+                                     'hash TEXT, '
+                                     'PRIMARY KEY (path, algorithm))')
+            self._connection.commit()
+
+    @staticmethod
+    def _get_stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get_file(self, path, instrument_type='sbe', **kwargs):
+        """ Returns the stored file object for path. Returns None if path is not in the index or has changed. """
+        stat = self._get_stat(path)
+        if not stat:
+            return None
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime, version, state FROM files '
+                                           'WHERE path=? AND instrument_type=? AND options=?',
+                                           (str(path), instrument_type, get_options_key(**kwargs))).fetchone()
+        if not row:
+            return None
+        size, mtime, version, state = row
+        if (size, mtime) != stat or version != FILE_INDEX_VERSION:
+            return None
+        try:
+            return pickle.loads(state)
+        except Exception as e:
+            logger.debug(f'Could not load file from index: {path}: {e}')
+            return None
+
+    def add_file(self, file_obj, instrument_type='sbe', commit=False, **kwargs):
+        """ Stores file_obj in the index. Call commit() to write pending changes to disk. """
+        stat = self._get_stat(file_obj.path)
+        if not stat:
+            return
+        state = pickle.dumps(file_obj, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                     (str(file_obj.path), instrument_type, get_options_key(**kwargs), stat[0],
+                                      stat[1], FILE_INDEX_VERSION, state))
+        if commit:
+            self.commit()
+
+    def get_content_hash(self, path, algorithm='md5', stat=None):
+        """ Returns the stored content hash for path. Returns None if not stored or if the file has changed. """
+        stat = stat or os.stat(path)
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime, hash FROM content_hashes WHERE path=? AND algorithm=?',
+                                           (str(path), algorithm)).fetchone()
+        if not row or tuple(row[:2]) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return row[2]
+
+    def add_content_hash(self, path, algorithm, content_hash, stat=None, commit=True):
+        stat = stat or os.stat(path)
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?, ?)',
+                                     (str(path), algorithm, stat.st_size, stat.st_mtime_ns, content_hash))
+        if commit:
+            self.commit()
+
+    def remove_file(self, path, commit=False):
+        with self._lock:
+            self._connection.execute('DELETE FROM files WHERE path=?', (str(path),))
+            self._connection.execute('DELETE FROM content_hashes WHERE path=?', (str(path),))
+        if commit:
+            self.commit()
+
+    def remove_missing_files(self):
+        """ Removes entries for files that no longer exist """
+        with self._lock:
+            paths = [row[0] for row in self._connection.execute('SELECT path FROM files UNION '
+                                                                 'SELECT path FROM content_hashes')]
+        for path in paths:
+            if not os.path.exists(path):
+                self.remove_file(path)
+        self.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM files')
+            self._connection.execute('DELETE FROM content_hashes')
+            self._connection.commit()
+
+    def commit(self):
+        with self._lock:
+            self._connection.commit()
+
+    def close(self):
+        self.commit()
+        self._connection.close()
+
+    @property
+    def nr_files(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
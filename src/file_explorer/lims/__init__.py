@@ -1,31 +1,31 @@
+from file_explorer import utils
+
 
 SHIP_MAPPING = {
     '7710': '77SE'
 }
 
 
+LIMS_KEY_COLUMNS = ['MYEAR', 'CTRYID', 'SHIPC', 'STNNO']
+
+
 def get_metadata_from_lims_export_file(path, columns, **kwargs):
     """
+    Only the key columns and the requested columns are read. The first row for each station is used. Empty and
+    missing values are left out.
     """
+    columns = set(columns)
+    df = utils.get_unique_rows_from_text_file(path, LIMS_KEY_COLUMNS, usecols=lambda col: col in columns,
+                                              sep=kwargs.get('sep', '\t'),
+                                              encoding=kwargs.get('encoding', 'cp1252'))
+    ships = (df['CTRYID'] + df['SHIPC']).replace(SHIP_MAPPING)
+    keys = df['MYEAR'] + '-' + ships + '-' + df['STNNO'].str.zfill(4)
+    meta_columns = [col for col in df.columns if col in columns]
+    records = df[meta_columns].to_dict('records')
     meta = {}
-    column_dict = {col: True for col in columns}
-    with open(path, encoding=kwargs.get('encoding', 'cp1252')) as fid:
-        header = None
-        for line in fid:
-            strip_line = line.strip()
-            if not strip_line:
-                continue
-            split_line = strip_line.split(kwargs.get('sep', '\t'))
-            if not header:
-                header = split_line
-                continue
-            d = dict(zip(header, split_line))
-            ship = f"{d['CTRYID']}{d['SHIPC']}"
-            ship = SHIP_MAPPING.get(ship, ship)
-            key = f"{d['MYEAR']}-{ship}-{d['STNNO'].zfill(4)}"
-            if meta.get(key):
-                continue
-            meta[key] = {key: value for key, value in d.items() if column_dict.get(key)}
+    for key, record in zip(keys.tolist(), records):
+        if key not in meta:
+            meta[key] = {col: value for col, value in record.items() if value}
     return meta
 
 
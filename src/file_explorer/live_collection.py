@@ -0,0 +1,123 @@
+import logging
+import pathlib
+import threading
+
+import file_explorer
+from file_explorer.file_handler import watcher
+from file_explorer.package_collection import PackageCollection
+
+logger = logging.getLogger(__name__)
+
+
+class LivePackageCollection(PackageCollection):
+    """
+    PackageCollection for a directory tree that is kept up to date from file system events. Call start() to begin
+    watching the directory. Only the changed file is parsed when an event arrives. Events can also be given
+    to handle_event (same format as the data sent by file_handler.watcher).
+    """
+
+    def __init__(self, directory, name=None, instrument_type='sbe', **kwargs):
+        self._directory = pathlib.Path(directory)
+        self._instrument_type = instrument_type
+        self._kwargs = kwargs
+        self._lock = threading.RLock()
+        self._packages_by_pattern = {}
+        self._pattern_by_path = {}
+        self._watcher = None
+        self._watcher_id = None
+        super().__init__(name or self._directory.name)
+        packages = file_explorer.get_packages_in_directory(self._directory, as_list=True,
+                                                           instrument_type=instrument_type, **kwargs)
+        for pack in packages:
+            self._add_live_package(pack)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def is_watching(self):
+        return self._watcher is not None
+
+    def start(self):
+        if self._watcher:
+            logger.info(f'Already watching directory: {self._directory}')
+            return
+        self._watcher_id = f'live_collection_{id(self)}'
+        self._watcher = watcher.keep_watch_of_folder(folder=self._directory, id=self._watcher_id,
+                                                     func=self.handle_event)
+
+    def stop(self):
+        if not self._watcher:
+            return
+        watcher._remove_watch_of_folder(self._watcher_id, self.handle_event)
+        self._watcher.stop()
+        self._watcher = None
+
+    def handle_event(self, data):
+        event_type = data.get('event_type')
+        with self._lock:
+            if event_type in ['created', 'modified']:
+                self.add_path(data['src_path'])
+            elif event_type == 'deleted':
+                self.remove_path(data['src_path'])
+            elif event_type == 'moved':
+                self.remove_path(data['src_path'])
+                self.add_path(data['dest_path'])
+
+    def _add_live_package(self, pack):
+        self.add_package(pack)
+        self._packages_by_pattern[pack.pattern] = pack
+        for file in pack.files:
+            self._pattern_by_path[str(file.path)] = pack.pattern
+
+    def add_path(self, path):
+        """ Parses the file and adds it to the package with the same pattern. Returns the package or None. """
+        path = pathlib.Path(path)
+        with self._lock:
+            if not path.is_file():
+                return None
+            if not file_explorer._path_is_selected(path, **self._kwargs):
+                return None
+            if str(path) in self._pattern_by_path:
+                self.remove_path(path)
+            try:
+                file = file_explorer.get_file_object_for_path(path, instrument_type=self._instrument_type,
+                                                              **self._kwargs)
+            except Exception as e:
+                # The file might not be completely written yet. A new event is sent when it is updated.
+                logger.warning(f'Could not read file {path}: {e}')
+                return None
+            if not file:
+                return None
+            PACK = file_explorer.PACKAGES.get(self._instrument_type)
+            file.package_instrument_type = PACK.INSTRUMENT_TYPE
+            pattern = file.pattern.upper()
+            pack = self._packages_by_pattern.get(pattern)
+            if pack is None:
+                pack = PACK(**self._kwargs)
+                pack.add_file(file)
+                self._add_live_package(pack)
+            elif pack.add_file(file):
+                self._pattern_by_path[str(path)] = pattern
+            else:
+                return None
+            self.reset_index()
+            logger.debug(f'Added {path} to package {pack.key}')
+            return pack
+
+    def remove_path(self, path):
+        """ Removes the file from its package. Empty packages are removed from the collection. """
+        path = pathlib.Path(path)
+        with self._lock:
+            pattern = self._pattern_by_path.pop(str(path), None)
+            if not pattern:
+                return None
+            pack = self._packages_by_pattern[pattern]
+            pack.remove_file(path)
+            if not pack.files:
+                self._packages_by_pattern.pop(pattern)
+                self.remove_package(pack)
+            self.reset_index()
+            logger.debug(f'Removed {path} from package {pack.key}')
+            return pack
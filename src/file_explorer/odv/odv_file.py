@@ -6,6 +6,7 @@ from file_explorer import file_data
 
 class OdvFile(InstrumentFile, file_data.DataFile):
     suffix = '.txt'
+    __slots__ = ('_parameters', '_sdn_reference', '_metadata')
 
     def _save_info_from_file(self):
         self._parameters = []
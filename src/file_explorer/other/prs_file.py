@@ -6,7 +6,10 @@ from file_explorer.file import InstrumentFile
 
 class PrsFile(InstrumentFile):
     suffix = '.prs'
-    _all_metadata = None
+    __slots__ = ('_all_metadata',)
+    _slot_defaults = {
+        '_all_metadata': None,
+    }
 
     @property
     def number_of_bottles(self):
@@ -1,5 +1,6 @@
 import datetime
 import shutil
+import types
 
 from file_explorer import utils
 from file_explorer import mapping
@@ -25,6 +26,7 @@ def _get_datetime(obj):
 
 
 class Operations:
+    __slots__ = ()
 
     def __call__(self, *args, **kwargs):
         pass
@@ -62,11 +64,17 @@ class Package(Operations):
     INSTRUMENT_TYPE = 'sbe'
     RAW_FILE_SUFFIXES = ['.bl', '.btl', '.hdr', '.hex', '.ros', '.xmlcon', '.con', '.xml']
     PLOT_FILE_SUFFIXES = ['.jpg']
+    __slots__ = ('_files', '_file_index', '_pattern', '_old_key', '_config_file_suffix', '_merged_attributes',
+                 '_lazy_files', '_attributes')
 
     def __init__(self, attributes=None, old_key=False, **kwargs):
         self._files = []
+        self._file_index = {}
+        self._pattern = None
         self._old_key = old_key
         self._config_file_suffix = None
+        self._merged_attributes = None
+        self._lazy_files = []
         attributes = attributes or {}
         self._attributes = dict((key, value.lower()) for key, value in attributes.items())
 
@@ -89,15 +97,19 @@ class Package(Operations):
         if suffix and suffix in self.suffix_list:
             logger.info(f'Looking for {keys=} with pre_suffix={suffix}')
             pref_attributes = self.get_file(suffix=suffix).attributes
+        self._load_lazy_files(*keys)
         if len(keys) == 1:
             key = keys[0].lower()
-            return pref_attributes.get(key, self.attributes.get(key, False))
-        return tuple([pref_attributes.get(key.lower(), self.attributes.get(key.lower(), False)) for key in keys])
+            return pref_attributes.get(key, self._get_merged_value(key))
+        return tuple([pref_attributes.get(key.lower(), self._get_merged_value(key.lower())) for key in keys])
 
     def __getitem__(self, item):
         return self.path(item)
 
     def __getattr__(self, item):
+        if item.startswith('__'):
+            # Special methods looked up by copy, pickle etc.
+            raise AttributeError(item)
         return self(item)
 
     def in_bbox(self, **kwargs):
@@ -116,7 +128,7 @@ class Package(Operations):
     def pattern(self):
         if not self._files:
             return False
-        return self._files[0].pattern.upper()
+        return self._pattern
 
     @property
     def files(self):
@@ -144,24 +156,92 @@ class Package(Operations):
         for file_obj in self._files:
             if not utils.is_matching(file_obj, **kwargs):
                 continue
-            elif file_obj.data is not None:
+            elif hasattr(type(file_obj), 'get_data') and file_obj.data is not None:
                 return file_obj.get_data(**kwargs)
 
     @property
     def attributes(self):
+        """
+        Read only view of the attributes of all files merged. The merge is made once and is reset when files are
+        added, the key is set or lazy files are read. Call reset_attributes_cache if files are changed in any other
+        way. A view returned before a reset is not updated. Files created with lazy=True are read before merging.
+        """
+        self._load_lazy_files()
+        return self._get_cached_attributes()
+
+    @property
+    def current_attributes(self):
+        """ Read only view of the merged attributes available without reading lazy files """
+        return self._get_cached_attributes()
+
+    def load_for_keys(self, *keys):
+        """ Reads the lazy files in the package that can not derive any of the given keys from the file path """
+        self._load_lazy_files(*keys)
+
+    def _get_cached_attributes(self):
+        if self._merged_attributes is None:
+            self._merged_attributes = types.MappingProxyType(self._get_merged_attributes())
+        return self._merged_attributes
+
+    def _load_lazy_files(self, *keys):
+        """ Reads the lazy files in the package. If keys are given files are only read until the merged values of
+        the keys are known (see _load_lazy_files_for_key). """
+        if not self._lazy_files:
+            return
+        if keys:
+            for key in keys:
+                self._load_lazy_files_for_key(key)
+        else:
+            for file_obj in self._lazy_files:
+                file_obj.save_info_from_file()
+        nr_lazy_files = len(self._lazy_files)
+        self._lazy_files = [file_obj for file_obj in self._lazy_files if not file_obj.is_loaded]
+        if len(self._lazy_files) != nr_lazy_files:
+            self.reset_attributes_cache()
+
+    def _load_lazy_files_for_key(self, key):
+        """ The merged value of key is taken from the last file with a value (see _get_merged_attributes). Files are
+        checked from the end and lazy files are only read if they can not derive key from the file path. """
+        key = key.lower()
+        for file_obj in reversed(self.files):
+            if not file_obj.is_loaded and not file_obj.is_path_attribute(key):
+                file_obj.save_info_from_file()
+            if file_obj.current_attributes.get(key):
+                return
+
+    def _get_merged_value(self, key):
+        """ Returns the value of key in the merged attributes. Uses the cached merge if it exists, otherwise only
+        the value of key is looked up. That way packages used through __call__ (setting keys, filtering etc.) do not
+        keep a merged copy of the attributes of all their files in memory. """
+        if self._merged_attributes is not None:
+            return self._merged_attributes.get(key, False)
+        for file_obj in reversed(self._files):
+            value = file_obj.current_attributes.get(key)
+            if value:
+                return value
+        return self._get_package_attributes().get(key, False)
+
+    def _get_package_attributes(self):
         attributes = dict()
         attributes.update(self._attributes)
         attributes['config_file_suffix'] = self._config_file_suffix
         attributes['nr_files'] = len(self.files)
         if self.files:
             attributes['pattern'] = self.files[0].pattern
-            for file_obj in self.files:
-                for key, value in file_obj.attributes.items():
-                    if not value:
-                        continue
-                    attributes[key] = value
         return attributes
 
+    def _get_merged_attributes(self):
+        attributes = self._get_package_attributes()
+        for file_obj in self.files:
+            for key, value in file_obj.current_attributes.items():
+                if not value:
+                    continue
+                attributes[key] = value
+        return attributes
+
+    def reset_attributes_cache(self):
+        self._merged_attributes = None
+
     @property
     def id(self):
         parts = [self('instrument'),
@@ -223,26 +303,78 @@ class Package(Operations):
                     test=self('test'))
 
     def add_file(self, file, replace=False, add_duplicates=False, **kwargs):
-        if file.name in self.file_names and not add_duplicates:
+        if not self._add_file(file, replace=replace, add_duplicates=add_duplicates):
             return False
-        elif self._files and file.pattern != self._files[0].pattern:
+        self.set_key()
+        return True
+
+    def add_files(self, files, replace=False, add_duplicates=False, **kwargs):
+        """
+        Adds several files to the package. The key is set once when all files are added.
+        Returns the number of added files.
+        """
+        nr_added = 0
+        for file in files:
+            if self._add_file(file, replace=replace, add_duplicates=add_duplicates):
+                nr_added += 1
+        if nr_added:
+            self.set_key()
+        return nr_added
+
+    def _add_file(self, file, replace=False, add_duplicates=False):
+        if file.name in self._file_index and not add_duplicates:
+            return False
+        elif self._files and file.pattern.upper() != self._pattern:
             return False
         if replace:
-            for file in self._files:
-                if file.get_proper_name() == file.get_proper_name():
-                    self._files.pop(self._files.index(file))
-
+            self._remove_files_with_same_proper_name(file)
+        if not self._files:
+            self._pattern = file.pattern.upper()
         self._files.append(file)
+        self._file_index[file.name] = file
+        if not file.is_loaded:
+            self._lazy_files.append(file)
         self._set_config_suffix(file)
+        self.reset_attributes_cache()
+        return True
+
+    def remove_file(self, path):
+        """ Removes the file with the given path from the package. Returns the removed file or None if not found. """
+        path = pathlib.Path(path)
+        for file in self._files:
+            if file.path == path:
+                break
+        else:
+            return None
+        self._files = [f for f in self._files if f is not file]
+        if self._file_index.get(file.name) is file:
+            self._file_index.pop(file.name)
+        self._lazy_files = [f for f in self._lazy_files if f is not file]
+        if not self._files:
+            self._pattern = None
         self.set_key()
+        return file
+
+    def _remove_files_with_same_proper_name(self, file):
+        key = self.key
+        if not key:
+            return
+        file.key = key
+        proper_name = file.get_proper_name()
+        self._files = [f for f in self._files if f.get_proper_name() != proper_name]
+        self._file_index = dict((f.name, f) for f in self._files)
+        file_ids = set(id(f) for f in self._files)
+        self._lazy_files = [f for f in self._lazy_files if id(f) in file_ids]
 
     def _set_config_suffix(self, file):
         if 'con' in file.suffix:
             self._config_file_suffix = file.suffix
 
     def set_key(self):
+        self.reset_attributes_cache()
+        key = self.key
         for file in self.files:
-            file.key = self.key
+            file.key = key
 
     def get_files(self, **kwargs):
         matching_files = []
@@ -276,7 +408,7 @@ class Package(Operations):
     def get_attributes_from_all_files(self):
         all_list = []
         for file in self.files:
-            all_list.append(file.attributes.copy())
+            all_list.append(dict(file.attributes))
         return all_list
 
     def write_attributes_from_all_files(self, directory, transpose=False):
@@ -342,6 +474,7 @@ class MvpPackage(Package):
     INSTRUMENT_TYPE = 'mvp'
     RAW_FILE_SUFFIXES = ['.eng', '.log', '.m1', '.raw', '.asc', '.asvp', '.calc', '.em1', '.rnn', '.s10', '.s12',
                          '.s52']
+    __slots__ = ()
 
     def _set_config_suffix(self, file):
         pass
@@ -366,6 +499,7 @@ class MvpPackage(Package):
 class OdvPackage(Package):
     INSTRUMENT_TYPE = 'odv'
     RAW_FILE_SUFFIXES = []
+    __slots__ = ()
 
     def _set_config_suffix(self, file):
         pass
@@ -390,6 +524,7 @@ class OdvPackage(Package):
 class PrsPackage(Package):
     INSTRUMENT_TYPE = 'prs'
     RAW_FILE_SUFFIXES = []
+    __slots__ = ()
 
     def _set_config_suffix(self, file):
         pass
@@ -1,7 +1,18 @@
+import datetime
+import logging
 import pathlib
 
-from file_explorer import utils
 from file_explorer.package import Package
+from file_explorer.package_index import PackageIndex
+
+logger = logging.getLogger(__name__)
+
+PARQUET_PARTITION_COLUMNS = ['year', 'ship', 'cruise']
+
+# Attributes added to every row when writing data
+DATA_KEY_COLUMNS = ['key', 'year', 'ship', 'cruise', 'serno', 'station', 'datetime', 'lat', 'lon']
+
+SCALAR_TYPES = (str, bool, int, float, datetime.datetime, datetime.date)
 
 
 class PackageCollection:
@@ -9,6 +20,7 @@ class PackageCollection:
     def __init__(self, name, packages=None):
         self._name = name
         self._packages = []
+        self._index = None
 
         if packages:
             self.add_packages(packages)
@@ -39,6 +51,15 @@ class PackageCollection:
         if not isinstance(package, Package):
             raise Exception('This is not a package')
         self._packages.append(package)
+        self._index = None
+
+    def remove_package(self, package):
+        nr_packages = len(self._packages)
+        self._packages = [pack for pack in self._packages if pack is not package]
+        if len(self._packages) != nr_packages:
+            self._index = None
+            return True
+        return False
 
     def add_packages(self, package_list):
         for package in package_list:
@@ -52,6 +73,16 @@ class PackageCollection:
     def packages(self):
         return self._packages
 
+    @property
+    def index(self) -> PackageIndex:
+        """ Index used when filtering the packages. Call reset_index if attributes of the packages are changed. """
+        if self._index is None:
+            self._index = PackageIndex(self._packages)
+        return self._index
+
+    def reset_index(self):
+        self._index = None
+
     @property
     def keys(self):
         return [pack.key for pack in self.packages]
@@ -73,10 +104,7 @@ class PackageCollection:
         return [(pack.key, len(pack.files)) for pack in self.packages]
 
     def get_packages_matching(self, as_collection=False, **kwargs):
-        matching_packages = []
-        for pack in self.packages:
-            if utils.is_matching(pack, **kwargs):
-                matching_packages.append(pack)
+        matching_packages = self.index.get_matching(**kwargs)
         if as_collection:
             return PackageCollection(f'subselection_{self.name}', matching_packages)
         return matching_packages
@@ -107,6 +135,56 @@ class PackageCollection:
         with open(path, 'w') as fid:
             fid.write('\n'.join(lines))
 
+    def get_attributes_dataframe(self):
+        """ Returns the attributes from all packages as a DataFrame with one row per package. Values that are not
+        scalars (sensor_info, header_form etc.) are left out. """
+        import pandas as pd
+        records = []
+        for pack in self.packages:
+            record = {'key': pack.key}
+            record.update((key, value) for key, value in pack.attributes.items() if isinstance(value, SCALAR_TYPES))
+            records.append(record)
+        return _get_typed_dataframe(pd.DataFrame.from_records(records))
+
+    def write_attributes_to_parquet(self, directory, partition_cols=None):
+        """ Writes the attributes from all packages to a parquet dataset in directory partitioned by partition_cols
+        (default year, ship and cruise). """
+        _check_parquet_engine()
+        df = self.get_attributes_dataframe()
+        path = pathlib.Path(directory, f'attributes_{self.name}')
+        _write_parquet_dataset(df, path, partition_cols)
+        return path
+
+    def get_data_dataframe(self, **kwargs):
+        """ Returns the data from all matching packages in one DataFrame. Attributes in DATA_KEY_COLUMNS identify the
+        package in every row. """
+        import pandas as pd
+        frames = []
+        for pack in self.get_packages_matching(**kwargs):
+            data = pack.get_data(**kwargs)
+            if data is None:
+                continue
+            data = data.copy()
+            for col in reversed(DATA_KEY_COLUMNS):
+                if col in data.columns:
+                    # Duplicate column names can not be written to parquet. The data column is kept.
+                    logger.debug(f'Data column {col} is used instead of package attribute in package {pack.key}')
+                    continue
+                data.insert(0, col, pack.key if col == 'key' else (pack(col) or None))
+            frames.append(data)
+        if not frames:
+            return pd.DataFrame(columns=DATA_KEY_COLUMNS)
+        return _get_typed_dataframe(pd.concat(frames, ignore_index=True))
+
+    def write_data_to_parquet(self, directory, partition_cols=None, **kwargs):
+        """ Writes the data from all matching packages to a parquet dataset in directory partitioned by
+        partition_cols (default year, ship and cruise). """
+        _check_parquet_engine()
+        df = self.get_data_dataframe(**kwargs)
+        path = pathlib.Path(directory, f'data_{self.name}')
+        _write_parquet_dataset(df, path, partition_cols)
+        return path
+
     def get_data(self, zpar=None, par=None, IN_zpar=None, IN_par=None, **kwargs):
         import pandas as pd
         all_data = {}
@@ -232,9 +310,60 @@ class PackageCollection:
         return True
 
     def filter(self, **kwargs) -> 'PackageCollection':
-        packs = utils.filter_packages(self.packages, **kwargs)
+        packs = self.index.get_matching(**kwargs)
         name = self.name
         if not name.startswith('filtered_'):
             name = f'filtered_{name}'
         col = PackageCollection(name=name, packages=packs)
         return col
+
+
+def _check_parquet_engine():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is needed to write parquet files. Install with: pip install file_explorer[parquet]')
+
+
+def _get_typed_dataframe(df):
+    """ Converts object columns with mixed types to strings so that every column gets one type in parquet """
+    import pandas as pd
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        values = df[col].dropna()
+        types = set(type(value) for value in values)
+        if types == {datetime.datetime} or types == {pd.Timestamp}:
+            df[col] = pd.to_datetime(df[col])
+        elif len(types) > 1:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _write_parquet_dataset(df, path, partition_cols=None):
+    if partition_cols is None:
+        partition_cols = PARQUET_PARTITION_COLUMNS
+    partition_cols = list(partition_cols)
+    for col in partition_cols:
+        if col not in df.columns:
+            df[col] = None
+        # Partition values are stored as strings in the directory names, see read_parquet_dataset
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    path.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, engine='pyarrow', partition_cols=partition_cols or None, index=False,
+                  existing_data_behavior='delete_matching')
+
+
+def read_parquet_dataset(path, partition_cols=None, **kwargs):
+    """ Reads a parquet dataset written by PackageCollection. Partition columns (default year, ship and cruise) are
+    read as strings, so that e.g. cruise '02' is not read as 2. kwargs are passed on to pandas.read_parquet. """
+    _check_parquet_engine()
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    if partition_cols is None:
+        partition_cols = PARQUET_PARTITION_COLUMNS
+    partitioning = None
+    if partition_cols:
+        partitioning = ds.partitioning(pa.schema([(col, pa.string()) for col in partition_cols]), flavor='hive')
+    return pd.read_parquet(path, engine='pyarrow', partitioning=partitioning, **kwargs)
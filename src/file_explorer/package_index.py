@@ -0,0 +1,184 @@
+import bisect
+import datetime
+import logging
+
+from file_explorer import utils
+
+logger = logging.getLogger(__name__)
+
+# Attributes with a hash index
+INDEXED_KEYS = ['ship', 'cruise', 'station', 'serno', 'instrument', 'year']
+
+
+class PackageIndex:
+    """
+    Secondary indexes over a list of packages. The indexes narrow down the packages that are checked with
+    utils.is_matching, so the result is the same as filtering all packages with utils.filter_packages.
+    Each index is built the first time it is needed. Lazy files are only read for keys not derived from the file
+    paths. Call reset (or create a new PackageIndex) if the attributes of the packages are changed.
+    """
+
+    def __init__(self, packages):
+        self._packages = list(packages)
+        self.reset()
+
+    def reset(self):
+        self._hash_indexes = {}
+        self._datetime_index = None
+        self._position_index = None
+
+    @property
+    def packages(self):
+        return self._packages
+
+    def get_matching(self, **kwargs):
+        """ Returns the packages matching kwargs in the same order as they were given """
+        try:
+            candidates = self._get_candidates(**kwargs)
+        except TypeError as e:
+            # Values that can not be compared with the indexed values. Let is_matching handle it.
+            logger.debug(f'Could not use package index: {e}')
+            candidates = None
+        if candidates is None:
+            packages = self._packages
+        else:
+            packages = [self._packages[i] for i in sorted(candidates)]
+        return [pack for pack in packages if utils.is_matching(pack, **kwargs)]
+
+    def _get_candidates(self, **kwargs):
+        """ Returns a set of package indexes that includes all matching packages. Returns None if no index is used. """
+        # Each group is a list of sets. A package is a candidate for the group if it is in any of the sets.
+        groups = []
+        for key, value in kwargs.items():
+            if 'IN_' in key or 'KC_' in key:
+                # is_matching keeps these flags for all following keys, so they are not compared exactly
+                break
+            if key not in INDEXED_KEYS:
+                continue
+            groups.append(self._get_hash_candidates(key, value))
+        groups.append(self._get_time_span_candidates(**kwargs))
+        groups.append(self._get_bbox_candidates(**kwargs))
+        groups = [group for group in groups if group is not None]
+        if not groups:
+            return None
+        groups.sort(key=lambda group: sum(len(item) for item in group))
+        candidates = set().union(*groups[0])
+        for group in groups[1:]:
+            candidates = {i for i in candidates if any(i in item for item in group)}
+        return candidates
+
+    def _get_hash_index(self, key):
+        if key not in self._hash_indexes:
+            index = {}
+            # Packages without the key are not filtered on the key in is_matching
+            unindexed = set()
+            for i, pack in enumerate(self._packages):
+                attributes = _get_attributes(pack, key)
+                if key not in attributes:
+                    unindexed.add(i)
+                    continue
+                hash_key = _get_hash_key(attributes[key])
+                if hash_key is None:
+                    unindexed.add(i)
+                    continue
+                index.setdefault(hash_key, set()).add(i)
+            self._hash_indexes[key] = index, unindexed
+        return self._hash_indexes[key]
+
+    def _get_hash_candidates(self, key, value):
+        if not value:
+            return None
+        hash_key = _get_hash_key(value)
+        if hash_key is None:
+            return None
+        index, unindexed = self._get_hash_index(key)
+        return [index.get(hash_key, set()), unindexed]
+
+    def _get_datetime_index(self):
+        if self._datetime_index is None:
+            items = []
+            unindexed = set()
+            for i, pack in enumerate(self._packages):
+                dtime = _get_attributes(pack, 'datetime').get('datetime')
+                if not dtime:
+                    # Never matching a time span
+                    continue
+                if isinstance(dtime, datetime.datetime):
+                    items.append((dtime, i))
+                else:
+                    unindexed.add(i)
+            items.sort(key=lambda item: item[0])
+            self._datetime_index = [item[0] for item in items], [item[1] for item in items], unindexed
+        return self._datetime_index
+
+    def _get_time_span_candidates(self, before=None, before_equal=None, after=None, after_equal=None, **kwargs):
+        if not any([before, before_equal, after, after_equal]):
+            return None
+        dtimes, indexes, unindexed = self._get_datetime_index()
+        start = 0
+        end = len(dtimes)
+        if after:
+            start = max(start, bisect.bisect_right(dtimes, after))
+        if after_equal:
+            start = max(start, bisect.bisect_left(dtimes, after_equal))
+        if before:
+            end = min(end, bisect.bisect_left(dtimes, before))
+        if before_equal:
+            end = min(end, bisect.bisect_right(dtimes, before_equal))
+        return [set(indexes[start:end]), unindexed]
+
+    def _get_position_index(self):
+        if self._position_index is None:
+            lats = []
+            lons = []
+            unindexed = set()
+            for i, pack in enumerate(self._packages):
+                attributes = _get_attributes(pack, 'lat', 'lon')
+                lat = attributes.get('lat')
+                lon = attributes.get('lon')
+                if not (lat and lon):
+                    # Never matching a bbox
+                    continue
+                try:
+                    lats.append((float(lat), i))
+                    lons.append((float(lon), i))
+                except (TypeError, ValueError):
+                    unindexed.add(i)
+            lats.sort()
+            lons.sort()
+            self._position_index = ([item[0] for item in lats], [item[1] for item in lats],
+                                    [item[0] for item in lons], [item[1] for item in lons],
+                                    unindexed)
+        return self._position_index
+
+    def _get_bbox_candidates(self, lat_min=None, lat_max=None, lon_min=None, lon_max=None, **kwargs):
+        if not any([lat_min, lat_max, lon_min, lon_max]):
+            return None
+        lats, lat_indexes, lons, lon_indexes, unindexed = self._get_position_index()
+        lat_candidates = set(lat_indexes[_get_range(lats, lat_min, lat_max)])
+        lon_candidates = set(lon_indexes[_get_range(lons, lon_min, lon_max)])
+        return [lat_candidates & lon_candidates, unindexed]
+
+
+def _get_attributes(pack, *keys):
+    """ Returns the attributes of pack. Lazy files are only read if they can not derive the keys from the path. """
+    pack.load_for_keys(*keys)
+    return pack.current_attributes
+
+
+def _get_range(values, value_min, value_max):
+    start = bisect.bisect_left(values, value_min) if value_min else 0
+    end = bisect.bisect_right(values, value_max) if value_max else len(values)
+    return slice(start, end)
+
+
+def _get_hash_key(value):
+    """ Values are compared in lower case in is_matching. Returns None for values that can not be indexed. """
+    if isinstance(value, str):
+        return value.lower()
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
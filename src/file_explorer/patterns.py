@@ -1,3 +1,4 @@
+import functools
 import re
 
 FILE_NAME_PATTERNS = [
@@ -125,11 +126,65 @@ CRUISE_PATTERNS = [
 ]
 
 
-def get_file_name_match(string):
-    for PATTERN in FILE_NAME_PATTERNS:
-        name_match = PATTERN.search(string.strip().lower())
+FILE_NAME_PATTERN_NAMES = [
+    'sbe_expedition',
+    'sbe_standard_test',
+    'sbe_standard',
+    'early_utsjon',
+    'dv_profile',
+    'mvp',
+    'mvp_tail',
+    'odv',
+]
+
+# Cheap check of the start of the file name to select which of the FILE_NAME_PATTERNS that can match.
+FILE_NAME_PREFIX_PATTERN = re.compile(r'^(?:(?P<sbe>[ud]?sbe)|'
+                                      r'(?P<ctd_profile>ctd_profile_)|'
+                                      r'(?P<mvp>[ud]?mvp_)|'
+                                      r'(?P<odv>\d*_odv_))')
+
+EARLY_UTSJON_PREFIX_PATTERN = re.compile(r'^\w{2}\d{2}[ud]')
+
+FILE_NAME_PREFIX_INDEXES = {
+    'sbe': [0, 1, 2],
+    'ctd_profile': [4],
+    'mvp': [5, 6],
+    'odv': [7],
+}
+
+EARLY_UTSJON_INDEX = 3
+
+
+def _get_candidate_pattern_indexes(name):
+    indexes = []
+    prefix_match = FILE_NAME_PREFIX_PATTERN.match(name)
+    if prefix_match:
+        indexes.extend(FILE_NAME_PREFIX_INDEXES[prefix_match.lastgroup])
+    if EARLY_UTSJON_PREFIX_PATTERN.match(name):
+        indexes.append(EARLY_UTSJON_INDEX)
+    return sorted(indexes)
+
+
+@functools.lru_cache(maxsize=2**17)
+def get_file_name_classification(string):
+    """
+    Returns a tuple (pattern_name, match) for the first of the FILE_NAME_PATTERNS matching the given file name.
+    Only patterns that can match the start of the name are tried. Returns (None, None) if no pattern matches.
+    """
+    name = string.strip().lower()
+    for index in _get_candidate_pattern_indexes(name):
+        name_match = FILE_NAME_PATTERNS[index].search(name)
         if name_match:
-            return name_match
+            return FILE_NAME_PATTERN_NAMES[index], name_match
+    return None, None
+
+
+def get_file_name_pattern_name(string):
+    return get_file_name_classification(string)[0]
+
+
+def get_file_name_match(string):
+    return get_file_name_classification(string)[1]
 
 
 def get_cruise_match(string):
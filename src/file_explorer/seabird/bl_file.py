@@ -6,7 +6,10 @@ from file_explorer.file import InstrumentFile
 
 class BlFile(InstrumentFile):
     suffix = '.bl'
-    _number_of_bottles = 0
+    __slots__ = ('_number_of_bottles',)
+    _slot_defaults = {
+        '_number_of_bottles': 0,
+    }
 
     @property
     def number_of_bottles(self):
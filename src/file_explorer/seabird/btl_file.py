@@ -6,6 +6,7 @@ from file_explorer.file import InstrumentFile
 
 class BtlFile(InstrumentFile):
     suffix = '.btl'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -19,23 +19,26 @@ logger = logging.getLogger(__name__)
 class CnvFile(InstrumentFile, file_data.DataFile):
     suffix = '.cnv'
     header_date_format = '%b %d %Y %H:%M:%S'
-    header = None
-    _header_datetime = None
-    _header_lat = None
-    _header_lon = None
-    _header_station = None
-    _header_form = {}
-    _header_names = None
-    _header_cruise_info = {}
-    _xml_tree = None
-    _parameters = {}
-    _sensor_info = None
-    _nr_data_lines = None
-
-    def __init__(self, *args, **kwargs):
-        self._rev_date: datetime.datetime | None = None
-        super().__init__(*args, **kwargs)
-
+    _psa_header_keys = ('datcvn', 'filter', 'celltm', 'loopedit', 'derive', 'split')
+    __slots__ = ('header', '_header_datetime', '_header_lat', '_header_lon', '_header_station', '_header_form',
+                 '_header_names', '_header_cruise_info', '_parameters', '_sensor_info', '_sensor_info_hash',
+                 '_nr_data_lines', '_rev_date', '_psa_info')
+    _slot_defaults = {
+        'header': None,
+        '_header_datetime': None,
+        '_header_lat': None,
+        '_header_lon': None,
+        '_header_station': None,
+        '_header_form': {},
+        '_header_names': None,
+        '_header_cruise_info': {},
+        '_parameters': {},
+        '_sensor_info': None,
+        '_sensor_info_hash': None,
+        '_nr_data_lines': None,
+        '_rev_date': None,
+        '_psa_info': {},
+    }
 
     def get_save_name(self):
         if self('prefix') == 'd':
@@ -66,6 +69,13 @@ class CnvFile(InstrumentFile, file_data.DataFile):
         self._attributes['header_names'] = self._header_names
         self._attributes['rev_date'] = self._rev_date
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if self._sensor_info_hash:
+            # Share the sensor info with other files loaded from the index
+            self._sensor_info = xmlcon_parser.share_config('sensor_info', self._sensor_info_hash, self._sensor_info)
+            self._attributes['sensor_info'] = self._sensor_info
+
     def _save_info_from_file(self):
         self._header_form = {'info': []}
         self._header_names = []
@@ -73,49 +83,53 @@ class CnvFile(InstrumentFile, file_data.DataFile):
         self._parameters = {}
         self._header_cruise_info = {}
         self._psa_info = {}
-        self._psa_header_keys = ['datcvn', 'filter', 'celltm', 'loopedit', 'derive', 'split']
 
         xml_lines = ['<?xml version="1.0" encoding="UTF-8"?>\n']
         is_xml = False
 
-        with open(self.path) as fid:
-            for line in fid:
-
-                # General header info
-                if line.startswith('* System UTC'):
-                    self._header_datetime = datetime.datetime.strptime(line.split('=')[1].strip(),
-                                                                       self.header_date_format)
-                elif line.startswith('* NMEA Latitude') and '=' in line and not self._header_lat:
-                    self._header_lat = line.split('=')[1].strip()[:-1].replace(' ', '')
-                elif line.startswith('* NMEA Longitude') and '=' in line and not self._header_lon:
-                    self._header_lon = line.split('=')[1].strip()[:-1].replace(' ', '')
-                elif line.startswith('** Latitude') and not self._header_lat:
-                    self._header_lat = line.split(':')[-1].strip().replace(' ', '')[:-1]
-                elif line.startswith('** Longitude') and not self._header_lon:
-                    self._header_lon = line.split(':')[-1].strip().replace(' ', '')[:-1]
-                elif line.startswith('** Station'):
-                    self._header_station = line.split(':')[-1].strip()
-                elif line.startswith('** Cruise'):
-                    self._header_cruise_info = get_cruise_match_dict(line.split(':')[-1].strip())
-
-                # Header form
-                elif line.startswith('**'):
-                    attrs = utils.get_dict_from_header_form_line(line)
-                    self._header_form.update(attrs)
-
-                # psa info
-                self._add_psa_info(line)
-
-                # XML
-                if line.startswith('# <Sensors count'):
-                    is_xml = True
-                if is_xml:
-                    xml_lines.append(line[2:])
-                if line.startswith('# </Sensors>'):
-                    is_xml = False
-                    self._xml_tree = xmlcon_parser.get_parser_from_string(''.join(xml_lines))
-                    logger.debug(self.path)
-                    self._sensor_info = xmlcon_parser.get_sensor_info(self._xml_tree)
+        for line in utils.get_header_lines(self.path, encoding=self.encoding):
+
+            # General header info
+            if line.startswith('* System UTC'):
+                self._header_datetime = datetime.datetime.strptime(line.split('=')[1].strip(),
+                                                                   self.header_date_format)
+            elif line.startswith('* NMEA Latitude') and '=' in line and not self._header_lat:
+                self._header_lat = line.split('=')[1].strip()[:-1].replace(' ', '')
+            elif line.startswith('* NMEA Longitude') and '=' in line and not self._header_lon:
+                self._header_lon = line.split('=')[1].strip()[:-1].replace(' ', '')
+            elif line.startswith('** Latitude') and not self._header_lat:
+                self._header_lat = line.split(':')[-1].strip().replace(' ', '')[:-1]
+            elif line.startswith('** Longitude') and not self._header_lon:
+                self._header_lon = line.split(':')[-1].strip().replace(' ', '')[:-1]
+            elif line.startswith('** Station'):
+                self._header_station = line.split(':')[-1].strip()
+            elif line.startswith('** Cruise'):
+                self._header_cruise_info = get_cruise_match_dict(line.split(':')[-1].strip())
+
+            # Header form
+            elif line.startswith('**'):
+                attrs = utils.get_dict_from_header_form_line(line)
+                self._header_form.update(attrs)
+
+            # Data column names
+            if line.startswith('# name'):
+                self._header_names.append(line.split(':', 1)[-1].strip())
+
+            # psa info
+            self._add_psa_info(line)
+
+            # XML
+            if line.startswith('# <Sensors count'):
+                is_xml = True
+            if is_xml:
+                xml_lines.append(line[2:])
+            if line.startswith('# </Sensors>'):
+                is_xml = False
+                logger.debug(self.path)
+                xml_text = ''.join(xml_lines)
+                self._sensor_info_hash = xmlcon_parser.get_text_hash(xml_text)
+                self._sensor_info = xmlcon_parser.get_sensor_info_from_text(xml_text,
+                                                                            text_hash=self._sensor_info_hash)
 
     def _add_psa_info(self, line):
         if not line.startswith('#'):
@@ -181,23 +195,39 @@ class CnvFile(InstrumentFile, file_data.DataFile):
 
     def _get_data_object(self):
         import pandas as pd
-        from io import StringIO
-        metadata = True
-        header = []
-        with open(self.path, encoding=self.encoding) as fid:
-            data = []
-            for line in fid:
-                if not line.strip():
-                    continue
-                if line.strip() == '*END*':
-                    metadata = False
-                    data.append('\t'.join(header))
-                elif line.startswith('# name'):
-                    par = line.split(':', 1)[-1].strip()
-                    header.append(par)
-                elif metadata:
-                    continue
-                else:
-                    data.append('\t'.join(line.split()))
-        df = pd.read_csv(StringIO('\n'.join(data)), sep='\t', encoding='cp1252')
+        if not self.is_loaded:
+            self.save_info_from_file()
+        if self._header_names is None:
+            # The header is not read for files created with load_file=False
+            self._header_names = get_header_names(self.path, encoding=self.encoding)
+        names = get_unique_column_names(self._header_names)
+        offset = utils.get_header_end_offset(self.path)
+        if offset is None:
+            return file_data.Data(pd.DataFrame(columns=names))
+        with open(self.path, 'rb') as fid:
+            fid.seek(offset)
+            try:
+                df = pd.read_csv(fid, sep=r'\s+', header=None, names=names, encoding=self.encoding)
+            except pd.errors.EmptyDataError:
+                df = pd.DataFrame(columns=names)
         return file_data.Data(df)
+
+
+def get_header_names(path, encoding='cp1252'):
+    """ Returns the data column names in the header of the cnv file """
+    return [line.split(':', 1)[-1].strip() for line in utils.get_header_lines(path, encoding=encoding)
+            if line.startswith('# name')]
+
+
+def get_unique_column_names(names):
+    """ Returns names with duplicates renamed to name.1, name.2 etc. in the same way as pandas.read_csv """
+    unique_names = []
+    counts = {}
+    for name in names:
+        unique_name = name
+        while unique_name in counts:
+            counts[name] += 1
+            unique_name = f'{name}.{counts[name]}'
+        counts[unique_name] = 0
+        unique_names.append(unique_name)
+    return unique_names
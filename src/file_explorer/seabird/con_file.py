@@ -3,6 +3,7 @@ from file_explorer.file import InstrumentFile
 
 class ConFile(InstrumentFile):
     suffix = '.con'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
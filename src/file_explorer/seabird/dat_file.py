@@ -4,6 +4,7 @@ from file_explorer.file import InstrumentFile
 
 class DatFile(InstrumentFile):
     suffix = '.dat'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         """ Binary file, sort of """
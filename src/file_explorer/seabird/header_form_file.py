@@ -1,6 +1,8 @@
 import datetime
 import logging
+import os
 import pathlib
+import shutil
 import socket
 from abc import ABC, abstractmethod
 from pathlib import Path
@@ -22,6 +24,7 @@ LIMS_SHIP_MAPPING = {'77SE': '7710',
                      '7710': '7710'}
 
 HEADER_FORM_PREFIX = '**'
+STREAM_CHUNK_SIZE = 1024 * 1024
 INFO_LINE_PREFIX = '*'
 
 HEADER_FORM_KEYS = {
@@ -360,8 +363,13 @@ def get_header_form_line_object(line: str, **kwargs):
 
 
 class HeaderFormFile:
+    """
+    Edits the header form (lines starting with **) in a seabird file. With stream=True (default) only the header is
+    read and the data section is copied byte by byte from the original file when saving. With stream=False the whole
+    file is kept in memory.
+    """
 
-    def __init__(self, file):
+    def __init__(self, file, stream=True):
         self._cls = None
         if isinstance(file, HdrFile):
             self._cls = HdrFile
@@ -378,6 +386,9 @@ class HeaderFormFile:
             logger.error(msg)
             raise FileNotFoundError(msg)
         self._file = file
+        self._stream = stream
+        self._data_offset = None
+        self._newline = '\n'
         self._lines = []
 
         self._lines_before: list[InfoLine] = []
@@ -413,6 +424,12 @@ class HeaderFormFile:
 
     def _load_file(self):
         self._lines = []
+        if self._stream:
+            self._data_offset = utils.get_header_end_offset(self.path)
+            self._newline = utils.get_newline(self.path)
+            for line in utils.get_header_lines(self.path, encoding=self._file.encoding):
+                self._lines.append(line.strip())
+            return self._lines
         with open(self.path) as fid:
             for line in fid:
                 self._lines.append(line.strip())
@@ -511,10 +528,25 @@ class HeaderFormFile:
         if output_path.exists() and not overwrite:
             raise FileExistsError(output_path)
         self._merge_lines()
-        with open(output_path, 'w') as fid:
-            fid.write('\n'.join(self._lines))
+        if self._stream and self._data_offset is not None:
+            self._save_file_streaming(output_path)
+        else:
+            with open(output_path, 'w') as fid:
+                fid.write('\n'.join(self._lines))
         return self._cls(output_path)
 
+    def _save_file_streaming(self, output_path):
+        """ Writes the header and copies the data section from the original file. output_path can be the path of
+        the original file since a temporary file is renamed when done. """
+        temp_path = output_path.with_name(f'{output_path.name}.part')
+        header = self._newline.join(self._lines) + self._newline
+        with open(temp_path, 'wb') as fid:
+            fid.write(header.encode(self._file.encoding))
+            with open(self.path, 'rb') as source:
+                source.seek(self._data_offset)
+                shutil.copyfileobj(source, fid, STREAM_CHUNK_SIZE)
+        os.replace(temp_path, output_path)
+
     def get_metadata(self, item):
         item = strip_meta_key(item)
         obj = self._header_form_lines_mapping.get(item)
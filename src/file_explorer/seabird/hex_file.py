@@ -1,18 +1,25 @@
 import datetime
+import pathlib
 import re
 
 from file_explorer.file import InstrumentFile
 from file_explorer.patterns import get_cruise_match_dict
 from file_explorer.seabird import utils
+from file_explorer.seabird import xmlcon_parser
 
 
 class HexFile(InstrumentFile):
     suffix = '.hex'
     date_format = '%d %b %Y %H:%M:%S'
-    _datetime = None
-    _station = None
-    _cruise_info = {}
-    _header_form = {}
+    __slots__ = ('_datetime', '_station', '_cruise_info', '_header_form', '_lat', '_lon')
+    _slot_defaults = {
+        '_datetime': None,
+        '_station': None,
+        '_cruise_info': {},
+        '_header_form': {},
+        '_lat': None,
+        '_lon': None,
+    }
 
     def _get_datetime(self):
         return self._datetime
@@ -20,31 +27,30 @@ class HexFile(InstrumentFile):
     def _save_info_from_file(self):
         self._cruise_info = {}
         self._header_form = {'info': []}
-        with open(self.path) as fid:
-            for line in fid:
-                if line.startswith('* cast'):
-                    reg = re.search(r'\d{1,2} \D{3} \d{4} \d{2}:\d{2}:\d{2}', line)
-                    if not reg:
-                        continue
-                    self._datetime = datetime.datetime.strptime(reg.group(), self.date_format)
-                elif line.startswith('** Latitude'):
-                    reg = re.search(r'\d{2} \d{2}.\d{1,2}', line)
-                    if not reg:
-                        continue
-                    self._lat = reg.group().replace(' ', '')
-                elif line.startswith('** Longitude'):
-                    reg = re.search(r'\d{2} \d{2}.\d{1,2}', line)
-                    if not reg:
-                        continue
-                    self._lon = reg.group().replace(' ', '')
-                elif line.startswith('** Station'):
-                    self._station = line.split(':')[-1].strip()
-                elif line.startswith('** Cruise'):
-                    self._cruise_info = get_cruise_match_dict(line.split(':')[-1].strip())
-                elif line.startswith('**'):
-                    # Header form
-                    attrs = utils.get_dict_from_header_form_line(line)
-                    self._header_form.update(attrs)
+        for line in utils.get_header_lines(self.path, encoding=self.encoding):
+            if line.startswith('* cast'):
+                reg = re.search(r'\d{1,2} \D{3} \d{4} \d{2}:\d{2}:\d{2}', line)
+                if not reg:
+                    continue
+                self._datetime = datetime.datetime.strptime(reg.group(), self.date_format)
+            elif line.startswith('** Latitude'):
+                reg = re.search(r'\d{2} \d{2}.\d{1,2}', line)
+                if not reg:
+                    continue
+                self._lat = reg.group().replace(' ', '')
+            elif line.startswith('** Longitude'):
+                reg = re.search(r'\d{2} \d{2}.\d{1,2}', line)
+                if not reg:
+                    continue
+                self._lon = reg.group().replace(' ', '')
+            elif line.startswith('** Station'):
+                self._station = line.split(':')[-1].strip()
+            elif line.startswith('** Cruise'):
+                self._cruise_info = get_cruise_match_dict(line.split(':')[-1].strip())
+            elif line.startswith('**'):
+                # Header form
+                attrs = utils.get_dict_from_header_form_line(line)
+                self._header_form.update(attrs)
 
     def _save_attributes(self):
         self._attributes.update(dict((key.lower(), value) for key, value in self._header_form.items()))
@@ -54,3 +60,29 @@ class HexFile(InstrumentFile):
         self._attributes['station'] = self._station
         self._attributes['cruise_info'] = self._cruise_info
         self._attributes['header_form'] = self._header_form
+
+    def get_xmlcon_path(self):
+        """ Returns the path to the xmlcon file with the same stem in the same directory. Returns None if not found. """
+        for path in self.path.parent.iterdir():
+            if path.stem == self.path.stem and path.suffix.lower() == '.xmlcon':
+                return path
+
+    def get_raw_scan_layout(self, xmlcon=None):
+        """ Returns the HexScanLayout given by xmlcon (path or XmlconFile). Defaults to the paired xmlcon file. """
+        from file_explorer.seabird import hex_scans
+        if xmlcon is None:
+            xmlcon = self.get_xmlcon_path()
+            if not xmlcon:
+                raise FileNotFoundError(f'No xmlcon file found for file: {self.path}')
+        xmlcon_path = getattr(xmlcon, 'path', None) or pathlib.Path(xmlcon)
+        tree = xmlcon_parser.get_parser_from_file(xmlcon_path)
+        return hex_scans.HexScanLayout(xmlcon_parser.get_scan_layout(tree))
+
+    def get_raw_scans(self, xmlcon=None):
+        """
+        Returns the scans in the data section as a structured numpy array with raw frequencies (Hz), voltage counts
+        and the additional words given by the xmlcon file. The file is memory mapped and decoded in one go.
+        """
+        from file_explorer.seabird import hex_scans
+        layout = self.get_raw_scan_layout(xmlcon)
+        return hex_scans.get_raw_scans(self.path, layout)
@@ -0,0 +1,174 @@
+import mmap
+
+import numpy as np
+
+from file_explorer.seabird import utils
+
+NR_FREQUENCY_CHANNELS = 5
+NR_VOLTAGE_WORDS = 4
+
+# Maps ascii codes of hex digits to their values
+_HEX_VALUES = np.zeros(256, dtype=np.uint8)
+for _i, _char in enumerate(b'0123456789ABCDEF'):
+    _HEX_VALUES[_char] = _i
+for _i, _char in enumerate(b'abcdef'):
+    _HEX_VALUES[_char] = _i + 10
+
+
+class HexScanLayout:
+    """
+    Byte layout of one scan in a hex file from a SBE 911plus. The layout is given by the Instrument element in the
+    xmlcon file (see xmlcon_parser.get_scan_layout):
+
+        frequencies       3 bytes per channel
+        voltages          3 bytes per word, two 12 bit values in each word
+        surface par       3 bytes (optional)
+        nmea position     7 bytes (optional)
+        nmea depth        3 bytes (optional)
+        nmea time         4 bytes (optional)
+        pressure sensor temperature (12 bits), status (4 bits) and modulo count (8 bits), 3 bytes
+        system time       4 bytes (optional)
+    """
+
+    def __init__(self, layout):
+        name = layout.get('name') or ''
+        if '911' not in name:
+            raise ValueError(f'Hex scans can only be decoded for SBE 911plus, not for instrument: {name or "unknown"}')
+        self.nr_frequencies = NR_FREQUENCY_CHANNELS - layout.get('frequency_channels_suppressed', 0)
+        self.nr_voltage_words = NR_VOLTAGE_WORDS - layout.get('voltage_words_suppressed', 0)
+        self.surface_par = layout.get('surface_par_voltage_added', False)
+        self.nmea_position = layout.get('nmea_position_data_added', False)
+        self.nmea_depth = layout.get('nmea_depth_data_added', False)
+        self.nmea_time = layout.get('nmea_time_added', False)
+        self.scan_time = layout.get('scan_time_added', False)
+        self.sensors = layout.get('sensors', [])
+
+    @property
+    def nr_voltages(self):
+        return self.nr_voltage_words * 2
+
+    @property
+    def bytes_per_scan(self):
+        nr_bytes = 3 * self.nr_frequencies + 3 * self.nr_voltage_words + 3
+        if self.surface_par:
+            nr_bytes += 3
+        if self.nmea_position:
+            nr_bytes += 7
+        if self.nmea_depth:
+            nr_bytes += 3
+        if self.nmea_time:
+            nr_bytes += 4
+        if self.scan_time:
+            nr_bytes += 4
+        return nr_bytes
+
+    @property
+    def dtype(self):
+        fields = [(f'frequency{i}', 'f8') for i in range(self.nr_frequencies)]
+        fields.extend([(f'voltage{i}', 'u2') for i in range(self.nr_voltages)])
+        if self.surface_par:
+            fields.append(('surface_par', 'u2'))
+        if self.nmea_position:
+            fields.extend([('lat', 'f8'), ('lon', 'f8'), ('new_position', '?')])
+        if self.nmea_depth:
+            fields.append(('nmea_depth', 'u4'))
+        if self.nmea_time:
+            fields.append(('nmea_time', 'u4'))
+        fields.extend([('pressure_temperature', 'u2'), ('status', 'u1'), ('modulo', 'u1')])
+        if self.scan_time:
+            fields.append(('scan_time', 'u4'))
+        return np.dtype(fields)
+
+    @property
+    def channels(self):
+        """ Maps frequency and voltage fields to the sensor names in the sensor array """
+        names = [f'frequency{i}' for i in range(self.nr_frequencies)] + \
+                [f'voltage{i}' for i in range(self.nr_voltages)]
+        return dict(zip(names, self.sensors))
+
+    def decode(self, data):
+        """ Decodes data (uint8 array with one row of bytes per scan) into a structured array """
+        scans = np.zeros(len(data), dtype=self.dtype)
+        data = data.astype(np.uint32)
+        pos = 0
+        for i in range(self.nr_frequencies):
+            b = data[:, pos:pos + 3]
+            scans[f'frequency{i}'] = b[:, 0] * 256 + b[:, 1] + b[:, 2] / 256
+            pos += 3
+        for i in range(self.nr_voltage_words):
+            b = data[:, pos:pos + 3]
+            scans[f'voltage{2 * i}'] = (b[:, 0] << 4) | (b[:, 1] >> 4)
+            scans[f'voltage{2 * i + 1}'] = ((b[:, 1] & 0x0F) << 8) | b[:, 2]
+            pos += 3
+        if self.surface_par:
+            b = data[:, pos:pos + 3]
+            scans['surface_par'] = ((b[:, 1] & 0x0F) << 8) | b[:, 2]
+            pos += 3
+        if self.nmea_position:
+            b = data[:, pos:pos + 7]
+            lat = ((b[:, 0] << 16) | (b[:, 1] << 8) | b[:, 2]) / 50000
+            lon = ((b[:, 3] << 16) | (b[:, 4] << 8) | b[:, 5]) / 50000
+            scans['lat'] = np.where(b[:, 6] & 0x80, -lat, lat)
+            scans['lon'] = np.where(b[:, 6] & 0x40, -lon, lon)
+            scans['new_position'] = b[:, 6] & 0x01
+            pos += 7
+        if self.nmea_depth:
+            b = data[:, pos:pos + 3]
+            scans['nmea_depth'] = (b[:, 0] << 16) | (b[:, 1] << 8) | b[:, 2]
+            pos += 3
+        if self.nmea_time:
+            scans['nmea_time'] = _get_little_endian_uint32(data[:, pos:pos + 4])
+            pos += 4
+        b = data[:, pos:pos + 3]
+        scans['pressure_temperature'] = (b[:, 0] << 4) | (b[:, 1] >> 4)
+        scans['status'] = b[:, 1] & 0x0F
+        scans['modulo'] = b[:, 2]
+        pos += 3
+        if self.scan_time:
+            scans['scan_time'] = _get_little_endian_uint32(data[:, pos:pos + 4])
+        return scans
+
+
+def _get_little_endian_uint32(b):
+    return b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16) | (b[:, 3] << 24)
+
+
+def _get_scan_bytes(buffer, offset, bytes_per_scan):
+    """
+    Returns the scans in buffer (starting at offset) as a uint8 array with one row per scan. Returns None if the lines
+    do not have the expected length. No views on buffer are kept when returning.
+    """
+    raw = np.frombuffer(buffer, dtype=np.uint8, offset=offset)
+    nr_chars = 2 * bytes_per_scan
+    line_length = nr_chars + 1
+    if len(raw) > nr_chars and raw[nr_chars] == ord('\r'):
+        line_length += 1
+    nr_lines = len(raw) // line_length
+    lines = raw[:nr_lines * line_length].reshape(nr_lines, line_length)
+    # The last line might not end with a line break
+    last_line = raw[nr_lines * line_length:]
+    if len(last_line) >= nr_chars:
+        chars = np.concatenate([lines[:, :nr_chars], last_line[:nr_chars].reshape(1, nr_chars)])
+    else:
+        chars = lines[:, :nr_chars]
+    is_valid = bool(np.all(lines[:, -1] == ord('\n')))
+    values = _HEX_VALUES[chars]
+    del raw, lines, last_line, chars
+    if not is_valid:
+        return None
+    return (values[:, 0::2] << 4) | values[:, 1::2]
+
+
+def get_raw_scans(path, layout):
+    """ Returns the scans in the hex file as a structured numpy array. layout is a HexScanLayout. """
+    offset = utils.get_header_end_offset(path)
+    if offset is None:
+        raise ValueError(f'No end of header found in file: {path}')
+    with open(path, 'rb') as fid:
+        if offset >= fid.seek(0, 2):
+            return np.zeros(0, dtype=layout.dtype)
+        with mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            data = _get_scan_bytes(buffer, offset, layout.bytes_per_scan)
+    if data is None:
+        raise ValueError(f'Scans in hex file do not have the expected length of {layout.bytes_per_scan} bytes: {path}')
+    return layout.decode(data)
@@ -3,6 +3,7 @@ from file_explorer.file import InstrumentFile
 
 class MetadataFile(InstrumentFile):
     suffix = '.metadata'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
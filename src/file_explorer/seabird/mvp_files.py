@@ -3,6 +3,7 @@ from file_explorer.file import InstrumentFile
 
 class LogFile(InstrumentFile):
     suffix = '.log'
+    __slots__ = ('_file_info',)
 
     def _save_info_from_file(self):
         self._file_info = {}
@@ -21,6 +22,7 @@ class LogFile(InstrumentFile):
 
 class EngFile(InstrumentFile):
     suffix = '.eng'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -31,6 +33,7 @@ class EngFile(InstrumentFile):
 
 class M1File(InstrumentFile):
     suffix = '.m1'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -41,6 +44,7 @@ class M1File(InstrumentFile):
 
 class RawFile(InstrumentFile):
     suffix = '.raw'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -51,6 +55,7 @@ class RawFile(InstrumentFile):
 
 class AscFile(InstrumentFile):
     suffix = '.asc'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -61,6 +66,7 @@ class AscFile(InstrumentFile):
 
 class AsvpFile(InstrumentFile):
     suffix = '.asvp'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -71,6 +77,7 @@ class AsvpFile(InstrumentFile):
 
 class CalcFile(InstrumentFile):
     suffix = '.calc'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -81,6 +88,7 @@ class CalcFile(InstrumentFile):
 
 class Em1File(InstrumentFile):
     suffix = '.em1'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -91,6 +99,7 @@ class Em1File(InstrumentFile):
 
 class RnnFile(InstrumentFile):
     suffix = '.rnn'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -101,6 +110,7 @@ class RnnFile(InstrumentFile):
 
 class S10File(InstrumentFile):
     suffix = '.s10'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -111,6 +121,7 @@ class S10File(InstrumentFile):
 
 class S12File(InstrumentFile):
     suffix = '.s12'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -121,6 +132,7 @@ class S12File(InstrumentFile):
 
 class S52File(InstrumentFile):
     suffix = '.s52'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -131,6 +143,7 @@ class S52File(InstrumentFile):
 
 class CnvFile(InstrumentFile):
     suffix = '.cnv'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
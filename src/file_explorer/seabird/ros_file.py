@@ -6,6 +6,7 @@ from file_explorer.file import InstrumentFile
 
 class RosFile(InstrumentFile):
     suffix = '.ros'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
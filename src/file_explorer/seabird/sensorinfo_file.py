@@ -3,6 +3,7 @@ from file_explorer.file import InstrumentFile
 
 class SensorinfoFile(InstrumentFile):
     suffix = '.sensorinfo'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
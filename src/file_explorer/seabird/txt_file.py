@@ -10,13 +10,17 @@ from file_explorer import file_data
 class TxtFile(InstrumentFile, file_data.DataFile):
     suffix = '.txt'
     date_format = '%b %d %Y %H:%M:%S'
-    _datetime = None
-    _station = None
-    _metadata = {}
-    _cruise_info = {}
-    _header_form = {}
-    _lat = None
-    _lon = None
+    __slots__ = ('_datetime', '_station', '_metadata', '_cruise_info', '_header_form', '_lat', '_lon', '_lat_dd',
+                 '_lon_dd', '_sensor_info', '_instrument_metadata', '_comment_qc', '_parameters', '_rev_date')
+    _slot_defaults = {
+        '_datetime': None,
+        '_station': None,
+        '_metadata': {},
+        '_cruise_info': {},
+        '_header_form': {},
+        '_lat': None,
+        '_lon': None,
+    }
 
     def _get_datetime(self):
         return self._datetime
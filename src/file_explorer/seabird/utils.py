@@ -1,6 +1,11 @@
 import re
 import functools
 
+from file_explorer import utils as file_explorer_utils
+
+HEADER_END = '*END*'
+HEADER_CHUNK_SIZE = 64 * 1024
+
 
 @functools.lru_cache
 def get_dict_from_header_form_line(line):
@@ -14,14 +19,14 @@ def get_dict_from_header_form_line(line):
         result['info'] = strip_line.strip()
         return result
     key, value = strip_line.split(':', 1)
-    result[key.strip()] = value.strip()
+    result[file_explorer_utils.intern_value(key.strip())] = value.strip()
 
     if '#' not in value:
         return result
 
     for item in value.split('#'):
         k, v = [part.strip() for part in item.split(':')]
-        result[k] = v
+        result[file_explorer_utils.intern_value(k)] = v
     return result
 
 
@@ -85,3 +90,62 @@ def get_header_form_information(path):
                     info[key] = value
     return info
 
+
+def _iter_raw_header_lines(path, chunk_size=HEADER_CHUNK_SIZE, end_marker=HEADER_END):
+    """
+    Yields (raw_line, end_offset) for the header lines in a seabird file. The file is read in chunks of chunk_size
+    bytes and reading stops at the line holding end_marker. end_offset is the byte offset just after the line.
+    """
+    marker = end_marker.encode()
+    offset = 0
+    rest = b''
+    with open(path, 'rb') as fid:
+        while True:
+            chunk = fid.read(chunk_size)
+            if not chunk:
+                if rest:
+                    yield rest, offset + len(rest)
+                return
+            rest = rest + chunk
+            start = 0
+            while True:
+                end = rest.find(b'\n', start)
+                if end == -1:
+                    break
+                raw_line = rest[start:end + 1]
+                start = end + 1
+                yield raw_line, offset + start
+                if raw_line.strip() == marker:
+                    return
+            offset += start
+            rest = rest[start:]
+
+
+def get_header_lines(path, encoding='cp1252', chunk_size=HEADER_CHUNK_SIZE, end_marker=HEADER_END):
+    """
+    Yields the header lines (including the end_marker line) in a seabird file without reading the data section.
+    Lines are decoded with the given encoding and end with a single newline as when iterating a text file.
+    """
+    for raw_line, _ in _iter_raw_header_lines(path, chunk_size=chunk_size, end_marker=end_marker):
+        line = raw_line.decode(encoding)
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        yield line
+
+
+def get_header_end_offset(path, chunk_size=HEADER_CHUNK_SIZE, end_marker=HEADER_END):
+    """ Returns the byte offset where the data section starts. Returns None if end_marker is not found. """
+    marker = end_marker.encode()
+    for raw_line, offset in _iter_raw_header_lines(path, chunk_size=chunk_size, end_marker=end_marker):
+        if raw_line.strip() == marker:
+            return offset
+
+
+def get_newline(path, chunk_size=HEADER_CHUNK_SIZE):
+    """ Returns the line ending (CRLF or LF) of the first line in the file """
+    with open(path, 'rb') as fid:
+        chunk = fid.read(chunk_size)
+    end = chunk.find(b'\n')
+    if end > 0 and chunk[end - 1:end] == b'\r':
+        return '\r\n'
+    return '\n'
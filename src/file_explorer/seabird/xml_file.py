@@ -1,32 +1,43 @@
-from file_explorer import mapping
 from file_explorer.file import InstrumentFile
 from file_explorer.seabird import xmlcon_parser
 
 
 class XmlFile(InstrumentFile):
     suffix = '.xml'
-    _tree = None
-    _sensor_info = None
+    __slots__ = ('_config', '_config_hash')
+    _slot_defaults = {
+        '_config': None,
+        '_config_hash': None,
+    }
 
     def _save_info_from_file(self):
-        self._tree = xmlcon_parser.get_parser_from_file(self.path, encoding='cp1252')
-        self._sensor_info = xmlcon_parser.get_sensor_info(self._tree)
+        with open(self.path, encoding='cp1252') as fid:
+            text = fid.read()
+        self._config_hash = xmlcon_parser.get_text_hash(text)
+        self._config = xmlcon_parser.get_xml_config(text, text_hash=self._config_hash)
 
     def _save_attributes(self):
-        self._attributes['sensor_info'] = self._sensor_info
+        self._attributes['sensor_info'] = self.sensor_info
         self._attributes['instrument'] = self.instrument
         self._attributes['instrument_number'] = self.instrument_number
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if self._config is not None:
+            # Share the configuration with other files loaded from the index
+            self._config = xmlcon_parser.share_config('xml', self._config_hash, self._config)
+            self._attributes['sensor_info'] = self.sensor_info
+
     @property
     def instrument_number(self):
-        data = xmlcon_parser.get_hardware_data(self._tree)
-        return data['SerialNumber']
+        return self._config['instrument_number']
 
     @property
     def instrument(self):
-        data = xmlcon_parser.get_hardware_data(self._tree)
-        return mapping.get_instrument_mapping(data['DeviceType'])
+        return self._config['instrument']
 
     @property
     def sensor_info(self):
-        return self._sensor_info
+        if self._config is None:
+            return None
+        return self._config['sensor_info']
@@ -1,12 +1,27 @@
 import xml.etree.ElementTree as ET
 
 from file_explorer import mapping
+from file_explorer import utils
 import datetime
+import hashlib
 import logging
+import threading
 
 
 logger = logging.getLogger(__name__)
 
+# Number of parsed configurations kept in memory
+CONFIG_CACHE_SIZE = 4096
+
+# Elements (paths below the root element) used from xmlcon and xml files
+XMLCON_CONFIG_PATHS = [('Instrument', 'Name'), ('Instrument', 'SensorArray')]
+XML_CONFIG_PATHS = [('InstrumentState', 'HardwareData')]
+
+PARSE_CHUNK_SIZE = 16 * 1024
+
+_config_cache = {}
+_config_cache_lock = threading.Lock()
+
 
 def get_parser_from_file(path, encoding=None):
     if encoding:
@@ -20,6 +35,120 @@ def get_parser_from_string(string):
     return ET.ElementTree(ET.fromstring(string))
 
 
+def get_partial_tree(text, paths, chunk_size=PARSE_CHUNK_SIZE):
+    """
+    Parses text (str or bytes) incrementally and returns an ElementTree with only the elements at the given paths
+    (tuples of tags below the root element), their sub elements and ancestors. Other elements are removed as soon
+    as they are parsed and parsing stops when all paths have been parsed.
+    """
+    paths = [tuple(path) for path in paths]
+    ancestors = {path[:i] for path in paths for i in range(len(path))}
+    remaining = set(paths)
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+    stack = []
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start:start + chunk_size])
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+                    stack.append(((), elem))
+                else:
+                    stack.append((stack[-1][0] + (elem.tag,), elem))
+                continue
+            path, elem = stack.pop()
+            if not path or path in ancestors:
+                continue
+            if any(path[:len(item)] == item for item in paths):
+                remaining.discard(path)
+                if not remaining:
+                    return ET.ElementTree(root)
+                continue
+            parent_path, parent = stack[-1]
+            # Sub elements of a removed element are removed with it
+            if parent_path in ancestors:
+                parent.remove(elem)
+    parser.close()
+    return ET.ElementTree(root)
+
+
+def get_text_hash(text):
+    """ Returns the hash used as key for parsed xml text (str or bytes) """
+    if isinstance(text, str):
+        text = text.encode('utf8')
+    return hashlib.sha1(text).hexdigest()
+
+
+def share_config(kind, text_hash, config):
+    """ Adds config to the cache if not already there. Returns the cached config. """
+    key = (kind, text_hash)
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+        if cached is not None:
+            return cached
+        if len(_config_cache) >= CONFIG_CACHE_SIZE:
+            _config_cache.pop(next(iter(_config_cache)))
+        _config_cache[key] = config
+    return config
+
+
+def get_cached_config(kind, text, parse_func, text_hash=None):
+    """
+    Returns parse_func(text). The result is cached by kind and a hash of the text, so a configuration that is used
+    in many files is only parsed once. The result is shared and must not be changed.
+    """
+    text_hash = text_hash or get_text_hash(text)
+    with _config_cache_lock:
+        config = _config_cache.get((kind, text_hash))
+    if config is not None:
+        return config
+    return share_config(kind, text_hash, parse_func(text))
+
+
+def clear_config_cache():
+    with _config_cache_lock:
+        _config_cache.clear()
+
+
+def freeze_sensor_info(sensor_info):
+    return tuple(utils.FrozenDict(item) for item in sensor_info)
+
+
+def _parse_sensor_info(text):
+    return freeze_sensor_info(get_sensor_info(get_parser_from_string(text)))
+
+
+def _parse_xmlcon_config(text):
+    tree = get_partial_tree(text, XMLCON_CONFIG_PATHS)
+    return utils.FrozenDict(sensor_info=freeze_sensor_info(get_sensor_info(tree)),
+                            instrument=get_instrument(tree),
+                            instrument_number=get_instrument_number(tree))
+
+
+def _parse_xml_config(text):
+    tree = get_partial_tree(text, XML_CONFIG_PATHS)
+    data = get_hardware_data(tree)
+    return utils.FrozenDict(sensor_info=freeze_sensor_info(get_sensor_info(tree)),
+                            instrument=mapping.get_instrument_mapping(data['DeviceType']),
+                            instrument_number=data['SerialNumber'])
+
+
+def get_sensor_info_from_text(text, text_hash=None):
+    """ Returns a shared tuple of read-only sensor_info dicts for the xml text (e.g. the sensor block in a cnv file) """
+    return get_cached_config('sensor_info', text, _parse_sensor_info, text_hash=text_hash)
+
+
+def get_xmlcon_config(text, text_hash=None):
+    """ Returns shared sensor_info, instrument and instrument_number for the content of a xmlcon file """
+    return get_cached_config('xmlcon', text, _parse_xmlcon_config, text_hash=text_hash)
+
+
+def get_xml_config(text, text_hash=None):
+    """ Returns shared sensor_info, instrument and instrument_number for the content of a xml file """
+    return get_cached_config('xml', text, _parse_xml_config, text_hash=text_hash)
+
+
 def get_sensor_info(tree):
     index = {}
     sensor_info = []
@@ -135,3 +264,34 @@ def get_datetime_object(date_str):
             format_str = '%d-%b-%Y'
         date_str = '-'.join(parts)
     return datetime.datetime.strptime(date_str, format_str)
+
+
+def get_scan_layout(tree):
+    """ Returns the information in the Instrument element needed to decode the scans in a hex file. """
+    instrument = tree.find('Instrument')
+    if instrument is None:
+        return {}
+
+    def _get_int(tag):
+        item = instrument.find(tag)
+        if item is None or not item.text:
+            return 0
+        return int(item.text)
+
+    sensors = []
+    sensor_array = instrument.find('SensorArray')
+    if sensor_array is not None:
+        for sensor in sensor_array.findall('Sensor'):
+            children = list(sensor)
+            sensors.append(children[0].tag if children else '')
+    return {
+        'name': instrument.find('Name').text,
+        'frequency_channels_suppressed': _get_int('FrequencyChannelsSuppressed'),
+        'voltage_words_suppressed': _get_int('VoltageWordsSuppressed'),
+        'surface_par_voltage_added': bool(_get_int('SurfaceParVoltageAdded')),
+        'nmea_position_data_added': bool(_get_int('NmeaPositionDataAdded')),
+        'nmea_depth_data_added': bool(_get_int('NmeaDepthDataAdded')),
+        'nmea_time_added': bool(_get_int('NmeaTimeAdded')),
+        'scan_time_added': bool(_get_int('ScanTimeAdded')),
+        'sensors': sensors,
+    }
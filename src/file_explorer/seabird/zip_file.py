@@ -6,6 +6,7 @@ from file_explorer.file import InstrumentFile
 
 class ZipFile(InstrumentFile):
     suffix = '.zip'
+    __slots__ = ()
 
     def _save_info_from_file(self):
         pass
@@ -1,16 +1,18 @@
 from .physical_chemical import get_metadata_from_sharkweb_btl_data
 from . import api
-from file_explorer import utils
-import requests
+from .cache import SharkwebCache
 
 
-def download_data_from_sharkweb(from_year: int, to_year: int = None):
-    to_year = to_year or from_year
-    temp_dir = utils.get_temp_directory('sharkweb_data')
-    print(f'{temp_dir}')
-    try:
-        file_paths = api.SHARKwebAPI(result_directory=utils.get_temp_directory('sharkweb_data')).save_files(datatypes=['Physical and Chemical'],
-                                                                                year_interval=[from_year, to_year])
-    except requests.exceptions.ConnectionError:
-        return None
-    return file_paths
+def download_data_from_sharkweb(from_year: int, to_year: int = None, cache: SharkwebCache = None, refresh=False):
+    """ Returns a list of data files (one per year) from the local SHARKweb cache. Files are downloaded if needed.
+    Returns None if no file could be found or downloaded. """
+    cache = cache or SharkwebCache()
+    file_paths = cache.get_files(from_year, to_year, refresh=refresh)
+    return file_paths or None
+
+
+def get_metadata_from_sharkweb(from_year: int, to_year: int = None, columns=None, cache: SharkwebCache = None,
+                               refresh=False):
+    """ Returns metadata ({short_key: meta}) from SHARKweb for the years in the interval using the local cache """
+    cache = cache or SharkwebCache()
+    return cache.get_metadata(from_year, to_year, columns=columns, refresh=refresh)
@@ -1,9 +1,24 @@
 
+import concurrent.futures
 import os
 import requests
 import json
 import uuid
 
+API_SERVER = 'https://sharkweb.smhi.se'
+
+# Number of years downloaded at the same time
+DEFAULT_WORKERS = 4
+
+
+def get_session(pool_size=DEFAULT_WORKERS):
+    """ Returns a requests.Session that keeps up to pool_size connections to the server open """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
 class SHARKwebAPI():
     """Datasource base class, used for fetching and filtering data
@@ -13,71 +28,82 @@ class SHARKwebAPI():
     first row holding the headers.
 
     """
-    def __init__(self, result_directory, file_parser=None):
+    def __init__(self, result_directory, file_parser=None, api_server=API_SERVER, session=None,
+                 workers=DEFAULT_WORKERS):
         self.result_directory = result_directory
+        self.api_server = api_server
+        self.workers = workers
+        self.session = session or get_session(pool_size=workers)
 
     def save_files(self, datatypes, year_interval):
 
-        filenames = []
-
         # We need to split download into several ones due to timeouts
         # on server. It seems that we can query a full year without a
-        # timeout appear, so lets do that.
+        # timeout appear, so lets do that. Years are downloaded concurrently.
 
+        jobs = []
         for datatype in datatypes:
+            for year in range(int(year_interval[0]), int(year_interval[1]) + 1):
+                filename = os.path.join(self.result_directory, f'sharkweb_{datatype}_{year}.txt')
+                jobs.append((datatype, [year, year], filename))
 
-            filename = os.path.join(self.result_directory, f'sharkweb_{datatype}_{year_interval[0]}-{year_interval[1]}.txt')
-            filenames.append(filename)
-
-            # if self.no_download and os.path.exists(filename):
-            #     self.file_explorer_logger.info('Skipping download, file exists \'%s\'' % filename)
-            #     continue
-
-            payload = {
-
-                'params': {
-                    'headerLang': 'short',
-                    'encoding': 'utf-8',
-                    'delimiters': 'point-tab',
-                    'tableView': 'sample_col_physicalchemical_columnparams'
-                },
-
-                'query': {
-                    'fromYear': year_interval[0],
-                    'toYear': year_interval[1],
-                    'dataTypes': datatype,
-                    # 'projects': ["NAT Nationell miljöövervakning"],
-                    # 'bounds': [[10.4, 58.2], [10.6, 58.3]],
-                },
-
-                'downloadId': str(uuid.uuid4()),
-            }
-
-            api_server = 'https://sharkweb.smhi.se'
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'text/plain',
-            }
-
-            # self.file_explorer_logger.info("Requesting download of samples for year '%s' id '%s'" % (year, payload['downloadId']))
-            with requests.post('%s/api/sample/download' % api_server,
-                                data=json.dumps(payload), headers=headers) as response:
-
-                response.raise_for_status()
-
-                data_location = response.headers['location']
-                # self.file_explorer_logger.info("Downloading data from location '%s' into filename '%s'" % (data_location , filename))
-                with requests.get('%s%s' % (api_server, data_location), stream=True) as data_response:
-                    data_response.raise_for_status()
-                    chunk_size = 1024*1024
-                    with open(filename, 'wb') as data_file:
-                        for chunk in data_response.iter_content(chunk_size=chunk_size):
-                            if not chunk:
-                                continue
-                            data_file.write(chunk)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.save_file, *job) for job in jobs]
+            filenames = [future.result() for future in futures]
 
         return filenames
 
+    def save_file(self, datatype, year_interval, filename, parser=None):
+        """ Downloads data for datatype and year_interval to filename. The file is replaced when the download is
+        complete, so an interrupted download never leaves a partial file. If parser is given (see
+        physical_chemical.SharkwebMetadataParser) every chunk of data is also given to parser.feed. """
+        payload = {
+
+            'params': {
+                'headerLang': 'short',
+                'encoding': 'utf-8',
+                'delimiters': 'point-tab',
+                'tableView': 'sample_col_physicalchemical_columnparams'
+            },
+
+            'query': {
+                'fromYear': year_interval[0],
+                'toYear': year_interval[1],
+                'dataTypes': datatype,
+                # 'projects': ["NAT Nationell miljöövervakning"],
+                # 'bounds': [[10.4, 58.2], [10.6, 58.3]],
+            },
+
+            'downloadId': str(uuid.uuid4()),
+        }
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'text/plain',
+        }
+
+        # self.file_explorer_logger.info("Requesting download of samples for year '%s' id '%s'" % (year, payload['downloadId']))
+        with self.session.post('%s/api/sample/download' % self.api_server,
+                               data=json.dumps(payload), headers=headers) as response:
+
+            response.raise_for_status()
+
+            data_location = response.headers['location']
+            # self.file_explorer_logger.info("Downloading data from location '%s' into filename '%s'" % (data_location , filename))
+            with self.session.get('%s%s' % (self.api_server, data_location), stream=True) as data_response:
+                data_response.raise_for_status()
+                chunk_size = 1024*1024
+                temp_filename = f'{filename}.part'
+                with open(temp_filename, 'wb') as data_file:
+                    for chunk in data_response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        data_file.write(chunk)
+                        if parser:
+                            parser.feed(chunk)
+                os.replace(temp_filename, filename)
+        return filename
+
 
 if __name__ == "__main__":
     SHARKwebAPI(result_directory = r'C:\mw\data\input_sharkadm_sharkweb').save_files(datatypes = ['Physical and Chemical'], year_interval=[2022, 2024])
\ No newline at end of file
@@ -0,0 +1,184 @@
+import concurrent.futures
+import datetime
+import json
+import logging
+import os
+import pathlib
+import pickle
+import threading
+
+import requests
+
+from file_explorer import utils
+from file_explorer.sharkweb import api
+from file_explorer.sharkweb.physical_chemical import SharkwebMetadataParser
+from file_explorer.sharkweb.physical_chemical import get_metadata_from_sharkweb_btl_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATATYPE = 'Physical and Chemical'
+
+# Data for the current year is still being added on SHARKweb
+DEFAULT_TTL = datetime.timedelta(hours=12)
+
+INDEX_FILE_NAME = 'sharkweb_cache.json'
+
+# Increase when the format of the metadata cache files changes
+METADATA_CACHE_VERSION = 2
+
+
+def get_default_cache_directory():
+    return utils.get_temp_directory('sharkweb_data')
+
+
+class SharkwebCache:
+    """
+    Local cache of SHARKweb downloads with one file per data type and year. Fetch times are stored in a json file in
+    the cache directory. Files for the current year (and later) are downloaded again when older than ttl. Files for
+    earlier years are kept until older than past_year_ttl (never if None). Parsed metadata is stored in a pickle
+    file next to each data file and is reused as long as the data file is unchanged. Years are downloaded
+    concurrently with the given number of workers.
+    """
+
+    def __init__(self, directory=None, ttl=DEFAULT_TTL, past_year_ttl=None, api_server=api.API_SERVER,
+                 workers=api.DEFAULT_WORKERS):
+        self._directory = pathlib.Path(directory) if directory else get_default_cache_directory()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl
+        self._past_year_ttl = past_year_ttl
+        self._workers = workers
+        self._api = api.SHARKwebAPI(result_directory=self._directory, api_server=api_server, workers=workers)
+        self._index_path = self._directory / INDEX_FILE_NAME
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def _load_index(self):
+        if not self._index_path.exists():
+            return {}
+        try:
+            with open(self._index_path, encoding='utf8') as fid:
+                return json.load(fid)
+        except (ValueError, OSError) as e:
+            logger.warning(f'Could not read SHARKweb cache index {self._index_path}: {e}')
+            return {}
+
+    def _save_index(self):
+        temp_path = self._index_path.with_name(f'{self._index_path.name}.part')
+        with open(temp_path, 'w', encoding='utf8') as fid:
+            json.dump(self._index, fid, indent=4)
+        os.replace(temp_path, self._index_path)
+
+    def get_file_path(self, year, datatype=DEFAULT_DATATYPE):
+        return self._directory / f'sharkweb_{datatype}_{year}.txt'
+
+    def get_fetch_time(self, year, datatype=DEFAULT_DATATYPE):
+        with self._lock:
+            fetched = self._index.get(self.get_file_path(year, datatype).name)
+        if not fetched:
+            return None
+        return datetime.datetime.fromisoformat(fetched)
+
+    def is_valid(self, year, datatype=DEFAULT_DATATYPE, now=None):
+        """ Returns True if the cached file for year can be used without downloading it again """
+        if not self.get_file_path(year, datatype).exists():
+            return False
+        fetched = self.get_fetch_time(year, datatype)
+        if not fetched:
+            return False
+        now = now or datetime.datetime.now()
+        ttl = self._ttl if int(year) >= now.year else self._past_year_ttl
+        if ttl is None:
+            return True
+        return now - fetched < ttl
+
+    def fetch(self, year, datatype=DEFAULT_DATATYPE, columns=None):
+        """ Downloads the data for year and datatype and returns the path to the file. If columns are given the
+        metadata is parsed while downloading and stored in the metadata cache. """
+        path = self.get_file_path(year, datatype)
+        logger.info(f'Downloading SHARKweb data for {year}: {datatype}')
+        parser = SharkwebMetadataParser(columns, encoding='utf8') if columns else None
+        self._api.save_file(datatype, [year, year], path, parser=parser)
+        with self._lock:
+            self._index[path.name] = datetime.datetime.now().isoformat()
+            self._save_index()
+        if parser:
+            meta = parser.close()
+            if meta is not None:
+                self._save_metadata(path, columns, meta)
+        return path
+
+    def get_file(self, year, datatype=DEFAULT_DATATYPE, refresh=False, columns=None):
+        """
+        Returns the path to the data file for year. The file is downloaded if missing, expired or if refresh is True.
+        If the download fails an existing file is returned. Returns None if there is no file.
+        """
+        path = self.get_file_path(year, datatype)
+        if not refresh and self.is_valid(year, datatype):
+            logger.debug(f'Using cached SHARKweb data: {path}')
+            return path
+        try:
+            return self.fetch(year, datatype, columns=columns)
+        except requests.exceptions.RequestException as e:
+            if path.exists():
+                logger.warning(f'Could not download SHARKweb data for {year}. Using cached file {path}: {e}')
+                return path
+            logger.error(f'Could not download SHARKweb data for {year}: {e}')
+            return None
+
+    def get_files(self, from_year, to_year=None, datatype=DEFAULT_DATATYPE, refresh=False, columns=None):
+        """ Returns a list of data files for the years in the interval. Years that could not be downloaded are
+        left out. """
+        to_year = to_year or from_year
+        years = range(int(from_year), int(to_year) + 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers) as executor:
+            futures = [executor.submit(self.get_file, year, datatype=datatype, refresh=refresh, columns=columns)
+                       for year in years]
+            paths = [future.result() for future in futures]
+        return [path for path in paths if path]
+
+    def _get_metadata_cache_path(self, path):
+        return path.with_name(f'{path.stem}.metadata.pickle')
+
+    @staticmethod
+    def _get_metadata_cache_key(path, columns):
+        stat = path.stat()
+        return METADATA_CACHE_VERSION, stat.st_size, stat.st_mtime_ns, tuple(sorted(columns))
+
+    def _save_metadata(self, path, columns, meta):
+        cache_path = self._get_metadata_cache_path(path)
+        temp_path = cache_path.with_name(f'{cache_path.name}.part')
+        with open(temp_path, 'wb') as fid:
+            pickle.dump((self._get_metadata_cache_key(path, columns), meta), fid, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+
+    def get_metadata_for_file(self, path, columns):
+        """ Returns metadata for the data file. Uses the stored metadata if the file and columns are unchanged. """
+        path = pathlib.Path(path)
+        cache_path = self._get_metadata_cache_path(path)
+        cache_key = self._get_metadata_cache_key(path, columns)
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as fid:
+                    stored_key, meta = pickle.load(fid)
+                if stored_key == cache_key:
+                    return meta
+            except Exception as e:
+                logger.debug(f'Could not load metadata cache {cache_path}: {e}')
+        meta = get_metadata_from_sharkweb_btl_data(path, columns=columns, encoding='utf8')
+        self._save_metadata(path, columns, meta)
+        return meta
+
+    def get_metadata(self, from_year, to_year=None, columns=None, datatype=DEFAULT_DATATYPE, refresh=False):
+        """ Returns metadata ({short_key: meta}) for the years in the interval. Downloaded years are parsed while
+        downloading. """
+        if not columns:
+            from file_explorer import seabird
+            columns = seabird.METADATA_COLUMNS
+        meta = {}
+        for path in self.get_files(from_year, to_year, datatype=datatype, refresh=refresh, columns=columns):
+            meta.update(self.get_metadata_for_file(path, columns))
+        return meta
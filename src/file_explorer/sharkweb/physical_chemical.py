@@ -1,5 +1,9 @@
+import codecs
+
 import pandas as pd
 
+from file_explorer import utils
+
 
 VALUE_MAPPING = {
     'NAT Nationell miljöövervakning extra provtagning': 'EXT',
@@ -18,6 +22,20 @@ def get_value_mapping(value):
     return ', '.join(sorted(new_values))
 
 
+SHARKWEB_KEY_COLUMNS = ['MYEAR', 'SHIPC', 'VISITID']
+
+SHARKWEB_COLUMN_MAPPING = {
+    'SLABO_PHYSCHEM': 'SLABO',
+    'STATN': 'station',
+    'LATIT_DM': 'latitude',
+    'LONGI_DM': 'longitude',
+    'SHIPC': 'ship',
+    'CRUISE_NO': 'cruise',
+    'VISITID': 'serno',
+    'MYEAR': 'year',
+}
+
+
 def get_metadata_from_sharkweb_btl_data(path, columns, **kwargs):
     """
     File requirements:
@@ -25,48 +43,119 @@ def get_metadata_from_sharkweb_btl_data(path, columns, **kwargs):
     Decimal/fältavgränsare: Punkt/tabb
     Radbtytning: Windows
     Teckenkodning: utf8
+
+    Only the key columns and the requested columns are read. The first row for each visit is used and
+    get_value_mapping is applied once per unique value. Empty and missing values are left out.
     """
+    columns = set(columns)
+
+    def _use_column(col):
+        return col in columns or SHARKWEB_COLUMN_MAPPING.get(col, col) in columns
+
+    df = utils.get_unique_rows_from_text_file(path, SHARKWEB_KEY_COLUMNS, usecols=_use_column,
+                                              sep=kwargs.get('sep', '\t'),
+                                              encoding=kwargs.get('encoding', 'cp1252'))
+    keys = df['MYEAR'] + '-' + df['SHIPC'] + '-' + df['VISITID'].str.zfill(4)
+
+    items = []
+    values = []
+    for col in df.columns:
+        if not _use_column(col):
+            continue
+        unique_values = df[col].unique()
+        mapped = dict(zip(unique_values, [get_value_mapping(value) for value in unique_values]))
+        values.append(df[col].map(mapped).tolist())
+        items.append([col, SHARKWEB_COLUMN_MAPPING.get(col, col)])
+
     meta = {}
-    mapping = {
-        'SLABO_PHYSCHEM': 'SLABO',
-        'STATN': 'station',
-        'LATIT_DM': 'latitude',
-        'LONGI_DM': 'longitude',
-        'SHIPC': 'ship',
-        'CRUISE_NO': 'cruise',
-        'VISITID': 'serno',
-        'MYEAR': 'year',
-
-    }
-    en = kwargs.get('encoding', 'cp1252')
-    # print(f'{en=}')
-    with open(path, encoding=kwargs.get('encoding', 'cp1252')) as fid:
-        header = None
-        for line in fid:
-            strip_line = line.strip()
-            if not strip_line:
-                continue
-            split_line = strip_line.split(kwargs.get('sep', '\t'))
-            if not header:
-                header = split_line
+    for key, *row in zip(keys.tolist(), *values):
+        if key in meta:
+            continue
+        meta[key] = {}
+        for (col, mapped_col), value in zip(items, row):
+            if not value:
                 continue
-            d = dict(zip(header, split_line))
-            key = f"{d['MYEAR']}-{d['SHIPC']}-{d['VISITID'].zfill(4)}"
-            if meta.get(key):
-                continue
-            meta[key] = {}
-            for k, value in d.items():
-                mapped_k = mapping.get(k, k)
-                if k not in columns and mapped_k not in columns:
-                    continue
-                mapped_value = get_value_mapping(value)
-                meta[key][k] = mapped_value
-                meta[key][mapped_k] = mapped_value
-
-            # meta[key] = {mapping.get(key, key): get_value_mapping(value) for key, value in d.items() if mapping.get(key, key) in columns}
+            meta[key][col] = value
+            meta[key][mapped_col] = value
     return meta
 
 
+class SharkwebMetadataParser:
+    """
+    Incremental version of get_metadata_from_sharkweb_btl_data. Data is given as chunks of bytes with feed (e.g.
+    while it is downloaded) and close returns the metadata. close returns None if the data is not a SHARKweb
+    export with the key columns.
+    """
+
+    def __init__(self, columns, encoding='utf8', sep='\t'):
+        self._columns = set(columns)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._sep = sep
+        self._rest = ''
+        self._header = None
+        self._key_indexes = None
+        self._items = None
+        self._valid = True
+        self._mapped_values = {}
+        self._meta = {}
+
+    def feed(self, data):
+        if not self._valid:
+            return
+        lines = (self._rest + self._decoder.decode(data)).split('\n')
+        self._rest = lines.pop()
+        for line in lines:
+            self._parse_line(line)
+
+    def close(self):
+        if self._valid:
+            line = self._rest + self._decoder.decode(b'', final=True)
+            self._rest = ''
+            self._parse_line(line)
+        if not self._valid or self._header is None:
+            return None
+        return self._meta
+
+    def _get_mapped_value(self, value):
+        mapped = self._mapped_values.get(value)
+        if mapped is None:
+            mapped = get_value_mapping(value)
+            self._mapped_values[value] = mapped
+        return mapped
+
+    def _parse_line(self, line):
+        line = line.rstrip('\r')
+        if not line.strip() or not self._valid:
+            return
+        split_line = line.split(self._sep)
+        if self._header is None:
+            self._set_header(split_line)
+            return
+        year, ship, visit = [split_line[i] if i < len(split_line) else '' for i in self._key_indexes]
+        key = f"{year}-{ship}-{visit.zfill(4)}"
+        if key in self._meta:
+            return
+        self._meta[key] = {}
+        for i, col, mapped_col in self._items:
+            value = self._get_mapped_value(split_line[i] if i < len(split_line) else '')
+            if not value:
+                continue
+            self._meta[key][col] = value
+            self._meta[key][mapped_col] = value
+
+    def _set_header(self, header):
+        if not all(col in header for col in SHARKWEB_KEY_COLUMNS):
+            self._valid = False
+            return
+        self._header = header
+        self._key_indexes = [header.index(col) for col in SHARKWEB_KEY_COLUMNS]
+        self._items = []
+        for i, col in enumerate(header):
+            mapped_col = SHARKWEB_COLUMN_MAPPING.get(col, col)
+            if col in self._columns or mapped_col in self._columns:
+                self._items.append((i, col, mapped_col))
+
+
 # This function takes longer to run....
 def old_get_metadata_from_sharkweb_btl_row_data(path, columns, **kwargs):
     """
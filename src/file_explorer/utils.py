@@ -5,6 +5,7 @@ import os
 import pathlib
 import platform
 import subprocess
+import sys
 
 EXPLORER_DIRECTORY = pathlib.Path.home() / 'file_explorer'
 
@@ -13,6 +14,50 @@ SHIP_TO_INTERNAL = {
     '77AR': '77_14'
 }
 
+# Keyword arguments that are passed along with filter arguments but are not attributes of files or packages.
+# is_matching skips these so that they do not trigger reading of lazy files.
+NON_FILTER_KEYS = {
+    'lat_min', 'lat_max', 'lon_min', 'lon_max',
+    'before', 'before_equal', 'after', 'after_equal',
+    'pref_suffix',
+    'lazy', 'load_file', 'edit_mode', 'ignore_pattern', 'no_datetime_from_file_name',
+    'index', 'workers', 'instrument_type', 'attributes', 'old_key', 'replace', 'add_duplicates',
+    'as_list', 'with_new_key', 'with_id_as_key',
+    'stem', 'match_string', 'exclude_directory', 'exclude_suffix', 'exclude_string',
+}
+
+# Number of rows read at a time by get_unique_rows_from_text_file
+TEXT_FILE_CHUNK_SIZE = 200_000
+
+# Longer strings are not interned by intern_value. They are seldom repeated between files.
+INTERN_MAX_LENGTH = 100
+
+
+def intern_value(value):
+    """ Returns the interned string for short strings so that equal values in many files share one object """
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def get_compact_dict(data: dict, unique_keys=()) -> dict:
+    """ Returns a copy of data with interned keys and values (see intern_value). Values for unique_keys differ
+    between objects and are not interned. """
+    return {intern_value(key): value if key in unique_keys else intern_value(value) for key, value in data.items()}
+
+
+class FrozenDict(dict):
+    """ A dict that can not be changed. Used for values that are shared between files. """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f'{self.__class__.__name__} can not be changed')
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
 
 def get_root_directory(*subfolders: str) -> pathlib.Path:
     if not EXPLORER_DIRECTORY.parent.exists():
@@ -141,7 +186,8 @@ def in_bbox(obj, lat_min=None, lat_max=None, lon_min=None, lon_max=None, **kwarg
 def in_time_span(obj, before=None, before_equal=None, after=None, after_equal=None, **kwargs):
     if not any([before, before_equal, after, after_equal]):
         return True
-    dtime = obj.attributes.get('datetime')
+    obj.load_for_keys('datetime')
+    dtime = obj.current_attributes.get('datetime')
     if not dtime:
         return None
     if before and before <= dtime:
@@ -163,13 +209,17 @@ def is_matching(obj, **kwargs):
     if not in_time_span(obj, **kwargs):
         return False
     for key, value in kwargs.items():
+        if key in NON_FILTER_KEYS or key.endswith('_encoding'):
+            continue
         if 'KC_' in key:
             key = key.replace('KC_', '')
             kc_ = True
         if 'IN_' in key:
             key = key.replace('IN_', '')
             in_ = True
-        if key not in obj.attributes:
+        # Lazy files are only read if the key is not derived from the file path
+        obj.load_for_keys(key)
+        if key not in obj.current_attributes:
             continue
         item = obj(key.lower())
         if item and not kc_:
@@ -196,10 +246,47 @@ def get_pos_from_comment_line(string):
 
 
 def filter_packages(packages, **kwargs):
-    """Filters a list of packages"""
+    """
+    Filters a list of packages. If any of the filter keys is in package_index.INDEXED_KEYS a PackageIndex is used,
+    so is_matching is only called for packages with a matching value. packages can also be a PackageIndex (e.g.
+    PackageCollection.index) to reuse indexes that are already built.
+    """
+    from file_explorer import package_index
+    if isinstance(packages, package_index.PackageIndex):
+        return packages.get_matching(**kwargs)
+    if any(key in package_index.INDEXED_KEYS for key in kwargs):
+        return package_index.PackageIndex(packages).get_matching(**kwargs)
     return_packs = []
     for pack in packages:
         if not is_matching(pack, **kwargs):
             continue
         return_packs.append(pack)
     return return_packs
+
+
+def get_unique_rows_from_text_file(path, key_columns, usecols=None, sep='\t', encoding='cp1252',
+                                   chunksize=TEXT_FILE_CHUNK_SIZE):
+    """
+    Returns a pandas DataFrame with the first row for every combination of key_columns in a delimited text file.
+    All values are strings. Only key_columns and the columns for which the callable usecols returns True are read.
+    The file is read in chunks and duplicates are dropped from each chunk, so large exports with many rows per
+    key are never held in memory.
+    """
+    import csv
+    import pandas as pd
+    key_columns = list(key_columns)
+
+    def _use_column(col):
+        return col in key_columns or bool(usecols and usecols(col))
+
+    try:
+        reader = pd.read_csv(path, sep=sep, encoding=encoding, dtype=str, keep_default_na=False,
+                             quoting=csv.QUOTE_NONE, usecols=_use_column, chunksize=chunksize)
+        chunks = [chunk.drop_duplicates(key_columns) for chunk in reader]
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=key_columns, dtype=str)
+    if not chunks:
+        return pd.DataFrame(columns=key_columns, dtype=str)
+    df = pd.concat(chunks, ignore_index=True).drop_duplicates(key_columns, ignore_index=True)
+    # Rows with missing trailing fields
+    return df.fillna('')
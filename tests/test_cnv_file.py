@@ -0,0 +1,35 @@
+from file_explorer.seabird import CnvFile
+from file_explorer.seabird.cnv_file import get_unique_column_names
+from file_explorer.tests.test_data import CNV_TEST_FILE
+
+
+def test_cnv_file_header_names():
+    cnv = CnvFile(CNV_TEST_FILE)
+    assert len(cnv.header_names) == 30
+    assert cnv.header_names[0] == 'Scan Count'
+    assert cnv.header_names[-1] == 'flag'
+
+
+def test_cnv_file_data():
+    cnv = CnvFile(CNV_TEST_FILE)
+    df = cnv.data
+    assert list(df.columns) == cnv.header_names
+    assert len(df) == 174
+    assert df['Scan Count'].iloc[0] == 15917
+    assert df['Pressure, Digiquartz [db]'].iloc[1] == 1.5
+
+
+def test_cnv_file_data_lazy():
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    assert cnv.data.shape == (174, 30)
+
+
+def test_cnv_file_data_without_loading_file():
+    cnv = CnvFile(CNV_TEST_FILE, load_file=False)
+    df = cnv.data
+    assert df.shape == (174, 30)
+    assert list(df.columns) == CnvFile(CNV_TEST_FILE).header_names
+
+
+def test_unique_column_names():
+    assert get_unique_column_names(['a', 'b', 'a', 'a']) == ['a', 'b', 'a.1', 'a.2']
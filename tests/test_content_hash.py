@@ -0,0 +1,49 @@
+import hashlib
+import os
+import shutil
+
+from file_explorer import content_hash
+from file_explorer import FileIndex
+from file_explorer.seabird import CnvFile
+from file_explorer.tests.test_data import CNV_TEST_FILE
+
+
+def test_content_hash_same_as_md5_of_content():
+    cnv = CnvFile(CNV_TEST_FILE)
+    assert cnv.md5 == hashlib.md5(CNV_TEST_FILE.read_bytes()).hexdigest()
+    assert cnv.content_hash('crc32') == content_hash.compute_content_hash(CNV_TEST_FILE, 'crc32', chunk_size=100)
+
+
+def test_content_hash_is_cached(monkeypatch, tmp_path):
+    path = shutil.copy2(CNV_TEST_FILE, tmp_path)
+    first = content_hash.get_content_hash(path)
+    monkeypatch.setattr(content_hash, 'compute_content_hash', None)
+    assert content_hash.get_content_hash(path) == first
+
+
+def test_content_hash_is_updated_when_file_changes(tmp_path):
+    path = shutil.copy2(CNV_TEST_FILE, tmp_path)
+    first = content_hash.get_content_hash(path)
+    with open(path, 'ab') as fid:
+        fid.write(b'\n')
+    assert content_hash.get_content_hash(path) != first
+
+
+def test_content_hash_stored_in_index(monkeypatch, tmp_path):
+    index = FileIndex(tmp_path / 'index.sqlite')
+    path = shutil.copy2(CNV_TEST_FILE, tmp_path)
+    first = content_hash.get_content_hash(path, index=index)
+    content_hash.clear_cache()
+    monkeypatch.setattr(content_hash, 'compute_content_hash', None)
+    assert index.get_content_hash(path, 'md5') == first
+    assert content_hash.get_content_hash(path, index=index) == first
+
+
+def test_files_equal_on_content(tmp_path):
+    path = shutil.copy(CNV_TEST_FILE, tmp_path)
+    os.utime(path, (1, 1))
+    assert CnvFile(path) == CnvFile(CNV_TEST_FILE)
+    other_path = tmp_path / 'other' / CNV_TEST_FILE.name
+    other_path.parent.mkdir()
+    other_path.write_bytes(CNV_TEST_FILE.read_bytes().replace(b'Station', b'Stations'))
+    assert not CnvFile(CNV_TEST_FILE) == CnvFile(other_path)
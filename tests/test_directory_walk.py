@@ -0,0 +1,52 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import file_explorer
+from file_explorer.tests.test_data import TEST_DATA_DIR
+
+
+def _get_paths_with_os_walk(directory, **kwargs):
+    paths = []
+    for root, dirs, files in os.walk(directory, topdown=False):
+        for name in files:
+            path = Path(root, name)
+            if file_explorer._path_is_selected(path, **kwargs):
+                paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    dict(exclude_string=None),
+    dict(exclude_string=['plots', 'UP_CAST']),
+    dict(exclude_directory='arkiv_2004'),
+    dict(exclude_directory='local', suffix='.CNV'),
+    dict(stem='0511', exclude_suffix='.hex'),
+    dict(match_string='SBE09_1387_2022'),
+])
+def test_walk_same_as_os_walk(kwargs):
+    assert file_explorer._get_paths_in_directory_tree(TEST_DATA_DIR, **kwargs) == \
+        _get_paths_with_os_walk(TEST_DATA_DIR, **kwargs)
+
+
+def test_walk_does_not_enter_excluded_directories(monkeypatch):
+    scanned = []
+    scandir = os.scandir
+
+    def _scandir(path):
+        scanned.append(Path(path).name)
+        return scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', _scandir)
+    paths = file_explorer._get_paths_in_directory_tree(TEST_DATA_DIR, exclude_directory='local',
+                                                       exclude_string='arkiv')
+    assert paths
+    assert 'local' not in scanned
+    assert not [name for name in scanned if 'arkiv' in name]
+
+
+def test_walk_is_lazy():
+    paths = file_explorer._iter_paths_in_directory_tree(TEST_DATA_DIR)
+    assert isinstance(next(paths), Path)
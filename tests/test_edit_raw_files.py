@@ -0,0 +1,46 @@
+import shutil
+
+import file_explorer
+from file_explorer.tests.test_data import CNV_TEST_FILE
+from file_explorer.tests.test_data import HDR_TEST_FILE
+from file_explorer.tests.test_data import HEX_TEST_FILE
+
+
+def _get_packages(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    for path in [HEX_TEST_FILE, HDR_TEST_FILE]:
+        shutil.copy2(path, source_dir)
+    return file_explorer.get_packages_in_directory(source_dir, as_list=True)
+
+
+def test_edit_seabird_raw_files_in_packages(tmp_path):
+    packs = _get_packages(tmp_path)
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+    new_packs = file_explorer.edit_seabird_raw_files_in_packages(packs, output_dir, workers=2, station='NEW STATION')
+    assert len(new_packs) == len(packs)
+    new_pack = new_packs[0]
+    assert new_pack.key == packs[0].key
+    assert sorted(file.name for file in new_pack.files) == sorted(file.name for file in packs[0].get_raw_files())
+    assert all(file.path.parent == output_dir for file in new_pack.files)
+    assert new_pack.get_file(suffix='.hdr')('station') == 'NEW STATION'
+
+
+def test_edit_seabird_raw_files_in_package_same_as_batch(tmp_path):
+    packs = _get_packages(tmp_path)
+    single_dir = tmp_path / 'single'
+    batch_dir = tmp_path / 'batch'
+    single_dir.mkdir()
+    batch_dir.mkdir()
+    single_pack = file_explorer.edit_seabird_raw_files_in_package(packs[0], single_dir, station='NEW STATION')
+    batch_pack = file_explorer.edit_seabird_raw_files_in_packages(packs, batch_dir, station='NEW STATION')[0]
+    assert single_pack.key == batch_pack.key
+    for file in single_pack.files:
+        assert file.path.read_bytes() == (batch_dir / file.name).read_bytes()
+
+
+def test_edit_seabird_raw_files_in_package_without_raw_files(tmp_path):
+    pack = file_explorer.get_packages_from_file_list([CNV_TEST_FILE], as_list=True)[0]
+    assert file_explorer.edit_seabird_raw_files_in_package(pack, tmp_path) is None
+    assert file_explorer.edit_seabird_raw_files_in_packages([pack], tmp_path) == [None]
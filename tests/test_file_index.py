@@ -0,0 +1,55 @@
+import shutil
+
+import file_explorer
+from file_explorer import FileIndex
+from file_explorer.seabird import HdrFile
+from file_explorer.tests.test_data import get_archive_path
+from file_explorer.tests.test_data import LOCAL_TEST_DIR
+
+KEY = 'SBE09_1387_20220918_1305_77SE_16_0847'
+
+
+def test_file_index_gives_same_packages(tmp_path):
+    index = FileIndex(tmp_path / 'index.sqlite')
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, index=index)
+    index_packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, index=index)
+    assert index.nr_files > 0
+    assert sorted(packs) == sorted(index_packs)
+    assert index_packs[KEY]('station') == packs[KEY]('station')
+    assert index_packs[KEY].nr_of_files == packs[KEY].nr_of_files
+
+
+def test_file_index_does_not_parse_unchanged_files(tmp_path, monkeypatch):
+    index = FileIndex(tmp_path / 'index.sqlite')
+    file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, index=index)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('File was parsed')
+
+    monkeypatch.setattr(HdrFile, '_save_info_from_file', fail)
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, index=index)
+    assert packs[KEY].get_file(suffix='.hdr')('station') == 'BY4 CHRISTIANSÖ'
+
+
+def test_file_index_reparses_changed_files(tmp_path):
+    directory = tmp_path / 'data'
+    shutil.copytree(get_archive_path('2004'), directory)
+    index = FileIndex(tmp_path / 'index.sqlite')
+    key = 'SBE09_0745_20040628_1348_77_14_0420'
+    pack = file_explorer.get_packages_in_directory(directory, index=index)[key]
+    hdr_path = pack['hdr']
+    assert index.get_file(hdr_path) is not None
+
+    with open(hdr_path, 'a') as fid:
+        fid.write('\n')
+    assert index.get_file(hdr_path) is None
+
+
+def test_file_index_stores_same_files_with_workers(tmp_path):
+    index = FileIndex(tmp_path / 'index.sqlite')
+    worker_index = FileIndex(tmp_path / 'worker_index.sqlite')
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, index=index, serno='0847')
+    worker_packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, index=worker_index, workers=2,
+                                                           serno='0847')
+    assert sorted(packs) == sorted(worker_packs) == [KEY]
+    assert worker_index.nr_files == index.nr_files > worker_packs[KEY].nr_of_files
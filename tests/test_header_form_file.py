@@ -0,0 +1,40 @@
+import shutil
+
+from file_explorer.seabird import HexFile
+from file_explorer.seabird import utils
+from file_explorer.seabird.header_form_file import HeaderFormFile
+from file_explorer.tests.test_data import HEX_TEST_FILE
+
+
+def _get_data_section(path):
+    with open(path, 'rb') as fid:
+        fid.seek(utils.get_header_end_offset(path))
+        return fid.read()
+
+
+def test_header_form_file_streaming_save(tmp_path):
+    obj = HeaderFormFile(HexFile(HEX_TEST_FILE))
+    obj.set_metadata('Station', 'NEW STATION')
+    new_file = obj.save_file(tmp_path)
+    assert new_file('station') == 'NEW STATION'
+    assert _get_data_section(new_file.path) == _get_data_section(HEX_TEST_FILE)
+
+
+def test_header_form_file_streaming_same_as_in_memory(tmp_path):
+    paths = []
+    for stream in [True, False]:
+        obj = HeaderFormFile(HexFile(HEX_TEST_FILE), stream=stream)
+        obj.set_metadata('Station', 'NEW STATION')
+        directory = tmp_path / str(stream)
+        directory.mkdir()
+        paths.append(obj.save_file(directory).path)
+    assert paths[0].read_bytes().rstrip(b'\n') == paths[1].read_bytes()
+
+
+def test_header_form_file_streaming_overwrite_source(tmp_path):
+    path = shutil.copy2(HEX_TEST_FILE, tmp_path)
+    obj = HeaderFormFile(HexFile(path))
+    obj.set_metadata('Station', 'NEW STATION')
+    new_file = obj.save_file(tmp_path, overwrite=True)
+    assert new_file('station') == 'NEW STATION'
+    assert _get_data_section(path) == _get_data_section(HEX_TEST_FILE)
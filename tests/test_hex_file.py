@@ -0,0 +1,54 @@
+import datetime
+
+import pytest
+
+from file_explorer.seabird import HexFile
+from file_explorer.seabird import hex_scans
+from file_explorer.seabird import utils
+from file_explorer.tests.test_data import HEX_TEST_FILE
+
+
+def test_hex_file_header_lines_stop_at_end():
+    lines = list(utils.get_header_lines(HEX_TEST_FILE))
+    assert lines[0].startswith('* Sea-Bird SBE 9 Data File')
+    assert lines[-1].strip() == '*END*'
+    assert len(lines) == 36
+
+
+def test_hex_file_header_end_offset():
+    offset = utils.get_header_end_offset(HEX_TEST_FILE, chunk_size=100)
+    with open(HEX_TEST_FILE, 'rb') as fid:
+        content = fid.read()
+    assert content[:offset].rstrip().endswith(b'*END*')
+    assert content[offset:offset + 10] == b'11DC3C09E0'
+
+
+def test_hex_file_header_info():
+    hex_obj = HexFile(HEX_TEST_FILE)
+    assert hex_obj('station') == 'HUVUDSKÄR'
+    assert hex_obj('lims job') == '20227710-0511'
+
+
+def test_hex_file_raw_scans():
+    hex_file = HexFile(HEX_TEST_FILE)
+    scans = hex_file.get_raw_scans()
+    with open(HEX_TEST_FILE, 'rb') as fid:
+        fid.seek(utils.get_header_end_offset(HEX_TEST_FILE))
+        assert len(scans) == len(fid.read().splitlines())
+    assert scans['frequency0'][0] == 0x11DC + 0x3C / 256
+    assert round(scans['lat'][0], 3) == 58.936
+    assert round(scans['lon'][0], 3) == 19.155
+    nmea_time = datetime.datetime(2000, 1, 1) + datetime.timedelta(seconds=int(scans['nmea_time'][0]))
+    assert nmea_time.strftime('%Y-%m-%d %H:%M') == '2022-06-13 18:02'
+    assert set((scans['modulo'][1:] - scans['modulo'][:-1]).tolist()) == {1}
+
+
+def test_hex_file_raw_scan_layout():
+    layout = HexFile(HEX_TEST_FILE).get_raw_scan_layout()
+    assert layout.bytes_per_scan == 41
+    assert layout.channels['frequency2'] == 'PressureSensor'
+
+
+def test_hex_scan_layout_unsupported_instrument():
+    with pytest.raises(ValueError, match='SBE 25'):
+        hex_scans.HexScanLayout({'name': 'SBE 25'})
@@ -1,7 +1,13 @@
+import copy
 import datetime
 import pathlib
 
+import pytest
+
 from file_explorer.file import InstrumentFile
+from file_explorer.seabird import HdrFile
+from file_explorer.seabird import HexFile
+from file_explorer.tests.test_data import HDR_TEST_FILE
 from file_explorer.tests.test_data import HEX_TEST_FILE
 
 #  For testing a ABC: https://clamytoe.github.io/articles/2020/Mar/12/testing-abcs-with-abstract-methods-with-pytest/
@@ -56,3 +62,32 @@ def test_instrument_file_attributes_call():
     assert dummy('datetime') == datetime.datetime(2022, 6, 13, 18, 0)
     assert dummy('date') == '2022-06-13'
     assert dummy('time') == '18:00'
+
+
+def test_instrument_file_attributes_are_shared_between_files():
+    hex_file = HexFile(HEX_TEST_FILE)
+    hdr_file = HdrFile(HDR_TEST_FILE)
+    hex_keys = {key: key for key in hex_file.attributes}
+    for key, value in hdr_file.attributes.items():
+        if key in hex_keys:
+            assert key is hex_keys[key]
+    assert hex_file('station') is hdr_file('station')
+    assert hex_file('path') != hdr_file('path')
+
+
+def test_instrument_file_special_attribute_lookup():
+    hex_file = HexFile(HEX_TEST_FILE, lazy=True)
+    with pytest.raises(AttributeError):
+        hex_file.__deepcopy__
+    assert not hex_file.is_loaded
+    assert copy.copy(hex_file).path == hex_file.path
+
+
+def test_instrument_file_has_no_instance_dict_and_path_values_are_not_copied():
+    hdr_file = HdrFile(HDR_TEST_FILE)
+    assert not hasattr(hdr_file, '__dict__')
+    assert 'serno' not in hdr_file._attributes
+    assert hdr_file('serno') == hdr_file._path_info['serno']
+    assert hdr_file.attributes['serno'] == hdr_file._path_info['serno']
+    copied = copy.copy(hdr_file)
+    assert dict(copied.attributes) == dict(hdr_file.attributes)
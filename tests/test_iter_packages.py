@@ -0,0 +1,54 @@
+import shutil
+import types
+
+import file_explorer
+from file_explorer.tests.test_data import LOCAL_TEST_DIR
+from file_explorer.tests.test_data import TEST_DATA_DIR
+
+
+def _get_summary(packages):
+    return sorted((pack.key, len(pack.files)) for pack in packages)
+
+
+def test_iter_packages_in_directory_same_as_list():
+    packages = file_explorer.get_packages_in_directory(TEST_DATA_DIR, as_list=True)
+    assert _get_summary(file_explorer.iter_packages_in_directory(TEST_DATA_DIR)) == _get_summary(packages)
+
+
+def test_iter_packages_in_directory_group_depth_0():
+    packages = file_explorer.get_packages_in_directory(TEST_DATA_DIR, as_list=True)
+    assert _get_summary(file_explorer.iter_packages_in_directory(TEST_DATA_DIR, group_depth=0)) == \
+        _get_summary(packages)
+
+
+def test_iter_packages_in_directory_yields_groups_while_walking(monkeypatch):
+    walked = []
+    walk = file_explorer._iter_selected_paths_by_directory
+
+    def _walk(*args, **kwargs):
+        for directory, paths in walk(*args, **kwargs):
+            walked.append(directory)
+            yield directory, paths
+
+    monkeypatch.setattr(file_explorer, '_iter_selected_paths_by_directory', _walk)
+    packages = file_explorer.iter_packages_in_directory(TEST_DATA_DIR)
+    assert isinstance(packages, types.GeneratorType)
+    next(packages)
+    assert TEST_DATA_DIR not in walked
+    list(packages)
+    assert walked[-1] == TEST_DATA_DIR
+
+
+def test_iter_packages_in_cruise_directory():
+    packages = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, as_list=True)
+    summary = _get_summary(file_explorer.iter_packages_in_directory(LOCAL_TEST_DIR))
+    assert summary == _get_summary(packages)
+    assert [nr_files for key, nr_files in summary] == [19, 16]
+
+
+def test_iter_packages_in_archive_of_cruises(tmp_path):
+    shutil.copytree(LOCAL_TEST_DIR, tmp_path / '2022' / 'cruise_14')
+    packages = file_explorer.get_packages_in_directory(tmp_path, as_list=True)
+    for group_depth in [1, 2, 3]:
+        assert _get_summary(file_explorer.iter_packages_in_directory(tmp_path, group_depth=group_depth)) == \
+            _get_summary(packages)
@@ -0,0 +1,90 @@
+import file_explorer
+from file_explorer.file import InstrumentFile
+from file_explorer.seabird import CnvFile
+from file_explorer.tests.test_data import CNV_TEST_FILE
+from file_explorer.tests.test_data import HDR_TEST_FILE
+from file_explorer.tests.test_data import HEX_TEST_FILE
+from file_explorer.tests.test_data import LOCAL_TEST_DIR
+
+KEY = 'SBE09_1387_20220918_1305_77SE_16_0847'
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError('File was read')
+
+
+def test_lazy_file_path_attributes_without_reading_file(monkeypatch):
+    monkeypatch.setattr(CnvFile, '_save_info_from_file', _fail)
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    assert cnv('ship') == '77SE'
+    assert cnv('serno') == '0511'
+    assert cnv('instrument_number') == '1387'
+    assert not cnv.is_loaded
+
+
+def test_lazy_file_is_read_on_datetime_from_header():
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    assert cnv('datetime') == CnvFile(CNV_TEST_FILE)('datetime')
+    assert cnv('time') == '18:02'
+    assert cnv.is_loaded
+
+
+def test_lazy_file_only_uses_groups_in_own_pattern():
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    assert 'cruise' in cnv.current_attributes
+    assert not cnv.is_path_attribute('station')
+    assert not cnv.is_path_attribute('date')
+
+
+def test_lazy_file_is_read_on_header_attribute():
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    assert not cnv.is_loaded
+    assert cnv('station') == CnvFile(CNV_TEST_FILE)('station')
+    assert cnv.is_loaded
+
+
+def test_lazy_packages_are_grouped_without_reading_files(monkeypatch):
+    keys = sorted(file_explorer.get_packages_in_directory(LOCAL_TEST_DIR))
+    monkeypatch.setattr(InstrumentFile, 'save_info_from_file', _fail)
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, lazy=True)
+    assert sorted(packs) == keys
+    assert packs[KEY]('serno') == '0847'
+    assert packs[KEY]('test') is False
+
+
+def test_lazy_packages_have_same_keys_as_loaded_packages():
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, lazy=True)
+    assert KEY in packs
+    assert packs[KEY]('serno') == '0847'
+    assert sorted(packs) == sorted(file_explorer.get_packages_in_directory(LOCAL_TEST_DIR))
+
+
+def test_lazy_package_key_from_header_time():
+    paths = [HDR_TEST_FILE, CNV_TEST_FILE, HEX_TEST_FILE]
+    lazy_pack = file_explorer.get_packages_from_file_list(paths, as_list=True, lazy=True)[0]
+    pack = file_explorer.get_packages_from_file_list(paths, as_list=True)[0]
+    assert lazy_pack.key == pack.key == 'SBE09_1387_20220613_1802_77SE_11_0511'
+    # The time is taken from the last file with a time (the hex file has none), as when merging attributes
+    assert [file.is_loaded for file in lazy_pack.files] == [False, True, True]
+
+
+def test_lazy_package_reads_files_on_header_attribute():
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, lazy=True)
+    pack = packs[KEY]
+    assert pack('station', pref_suffix='.hdr') == 'BY4 CHRISTIANSÖ'
+    assert pack('lims job') == '20227710-0847'
+
+
+def test_filter_on_path_attribute_does_not_read_lazy_files(monkeypatch):
+    monkeypatch.setattr(CnvFile, '_save_info_from_file', _fail)
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    assert cnv('serno', ship='77SE') == '0511'
+    assert cnv('serno', serno='0512') is None
+    assert not cnv.is_loaded
+
+
+def test_filter_on_header_attribute_reads_lazy_file():
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+    station = CnvFile(CNV_TEST_FILE)('station')
+    assert cnv('serno', station=station) == '0511'
+    assert cnv.is_loaded
@@ -0,0 +1,63 @@
+import pathlib
+import shutil
+import time
+
+from file_explorer.live_collection import LivePackageCollection
+from file_explorer.tests.test_data import CNV_TEST_FILE
+from file_explorer.tests.test_data import LOCAL_TEST_DIR
+
+KEY_0600 = 'SBE09_1387_20220823_1041_77SE_14_0600'
+KEY_0511 = 'SBE09_1387_20220613_1802_77SE_11_0511'
+
+
+def _get_live_packages(tmp_path):
+    shutil.copytree(pathlib.Path(LOCAL_TEST_DIR, 'raw'), pathlib.Path(tmp_path, 'raw'))
+    return LivePackageCollection(tmp_path)
+
+
+def test_live_add_and_remove_file(tmp_path):
+    collection = _get_live_packages(tmp_path)
+    assert len(collection.keys) == 2
+
+    path = pathlib.Path(tmp_path, 'cnv', CNV_TEST_FILE.name)
+    path.parent.mkdir()
+    shutil.copy2(CNV_TEST_FILE, path)
+    collection.handle_event(dict(event_type='created', src_path=path))
+    assert KEY_0511 in collection.keys
+    assert collection.filter(serno='0511').keys == [KEY_0511]
+
+    path.unlink()
+    collection.handle_event(dict(event_type='deleted', src_path=path))
+    assert KEY_0511 not in collection.keys
+    assert collection.filter(serno='0511').keys == []
+
+
+def test_live_file_added_to_existing_package(tmp_path):
+    collection = _get_live_packages(tmp_path)
+    source = pathlib.Path(LOCAL_TEST_DIR, 'cnv', f'{KEY_0600}.cnv')
+    path = pathlib.Path(tmp_path, 'cnv', source.name)
+    path.parent.mkdir()
+    shutil.copy2(source, path)
+    collection.handle_event(dict(event_type='created', src_path=path))
+    assert len(collection.keys) == 2
+    assert '.cnv' in collection[KEY_0600].suffix_list
+
+    path.unlink()
+    collection.handle_event(dict(event_type='deleted', src_path=path))
+    assert '.cnv' not in collection[KEY_0600].suffix_list
+    assert '.hex' in collection[KEY_0600].suffix_list
+
+
+def test_live_watches_directory(tmp_path):
+    collection = _get_live_packages(tmp_path)
+    collection.start()
+    try:
+        time.sleep(0.5)
+        shutil.copy2(CNV_TEST_FILE, pathlib.Path(tmp_path, CNV_TEST_FILE.name))
+        for _ in range(50):
+            if KEY_0511 in collection.keys:
+                break
+            time.sleep(0.1)
+        assert KEY_0511 in collection.keys
+    finally:
+        collection.stop()
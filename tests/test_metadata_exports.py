@@ -0,0 +1,88 @@
+from file_explorer import lims
+from file_explorer import seabird
+from file_explorer.sharkweb import physical_chemical
+
+SHARKWEB_ROWS = [
+    ['MYEAR', 'SHIPC', 'VISITID', 'STATN', 'PROJ', 'DEPH', 'TEMP'],
+    ['2022', '77SE', '12', 'BY5', 'NAT Nationell miljöövervakning, X', '0', '10.1'],
+    ['2022', '77SE', '12', 'BY5', 'NAT Nationell miljöövervakning, X', '10', '9.1'],
+    ['2022', '77SE', '13', 'BY15', 'Havs- och vattenmyndigheten', '0', '8.0'],
+]
+
+LIMS_ROWS = [
+    ['MYEAR', 'CTRYID', 'SHIPC', 'STNNO', 'WADEP', 'DEPH'],
+    ['2022', '77', '10', '12', '45', '0'],
+    ['2022', '77', '10', '12', '46', '10'],
+    ['2023', '77', '14', '3', '80', '0'],
+]
+
+
+def _write_rows(path, rows, encoding):
+    with open(path, 'w', encoding=encoding, newline='') as fid:
+        for row in rows:
+            fid.write('\t'.join(row) + '\r\n')
+        fid.write('\r\n')
+
+
+def test_sharkweb_metadata(tmp_path):
+    path = tmp_path / 'sharkweb.txt'
+    _write_rows(path, SHARKWEB_ROWS, 'utf8')
+    meta = physical_chemical.get_metadata_from_sharkweb_btl_data(path, columns=seabird.METADATA_COLUMNS,
+                                                                 encoding='utf8')
+    assert list(meta) == ['2022-77SE-0012', '2022-77SE-0013']
+    assert meta['2022-77SE-0012'] == {'MYEAR': '2022', 'year': '2022', 'SHIPC': '77SE', 'ship': '77SE',
+                                      'VISITID': '12', 'serno': '12', 'STATN': 'BY5', 'station': 'BY5',
+                                      'PROJ': 'NAT, X'}
+    assert meta['2022-77SE-0013']['PROJ'] == 'HAV'
+
+
+def test_sharkweb_metadata_parser_same_as_file(tmp_path):
+    path = tmp_path / 'sharkweb.txt'
+    _write_rows(path, SHARKWEB_ROWS, 'utf8')
+    data = path.read_bytes()
+    parser = physical_chemical.SharkwebMetadataParser(seabird.METADATA_COLUMNS)
+    # Chunks split lines and multibyte characters
+    for i in range(0, len(data), 7):
+        parser.feed(data[i:i + 7])
+    assert parser.close() == physical_chemical.get_metadata_from_sharkweb_btl_data(
+        path, columns=seabird.METADATA_COLUMNS, encoding='utf8')
+
+
+def test_sharkweb_metadata_parser_invalid_data():
+    parser = physical_chemical.SharkwebMetadataParser(seabird.METADATA_COLUMNS)
+    parser.feed(b'<html>Server error</html>')
+    assert parser.close() is None
+
+
+def test_sharkweb_metadata_empty_file(tmp_path):
+    path = tmp_path / 'sharkweb.txt'
+    path.write_text('')
+    assert physical_chemical.get_metadata_from_sharkweb_btl_data(path, columns=seabird.METADATA_COLUMNS) == {}
+
+
+def test_lims_metadata(tmp_path):
+    path = tmp_path / 'lims.txt'
+    _write_rows(path, LIMS_ROWS, 'cp1252')
+    meta = lims.get_metadata_from_lims_export_file(path, columns=seabird.METADATA_COLUMNS)
+    assert meta == {
+        '2022-77SE-0012': {'MYEAR': '2022', 'SHIPC': '10', 'WADEP': '45'},
+        '2023-7714-0003': {'MYEAR': '2023', 'SHIPC': '14', 'WADEP': '80'},
+    }
+
+
+def test_metadata_without_empty_values(tmp_path):
+    path = tmp_path / 'sharkweb.txt'
+    # Missing trailing field and empty field
+    _write_rows(path, [SHARKWEB_ROWS[0], ['2022', '77SE', '14', 'BY2', '', '0']], 'utf8')
+    meta = physical_chemical.get_metadata_from_sharkweb_btl_data(path, columns=seabird.METADATA_COLUMNS,
+                                                                 encoding='utf8')
+    assert meta['2022-77SE-0014'] == {'MYEAR': '2022', 'year': '2022', 'SHIPC': '77SE', 'ship': '77SE',
+                                      'VISITID': '14', 'serno': '14', 'STATN': 'BY2', 'station': 'BY2'}
+    parser = physical_chemical.SharkwebMetadataParser(seabird.METADATA_COLUMNS)
+    parser.feed(path.read_bytes())
+    assert parser.close() == meta
+
+    path = tmp_path / 'lims.txt'
+    _write_rows(path, [LIMS_ROWS[0], ['2022', '77', '10', '12']], 'cp1252')
+    meta = lims.get_metadata_from_lims_export_file(path, columns=seabird.METADATA_COLUMNS)
+    assert meta == {'2022-77SE-0012': {'MYEAR': '2022', 'SHIPC': '10'}}
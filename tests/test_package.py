@@ -46,4 +46,56 @@ def test_suffix_in_package():
     assert nr_suffix == 12
 
 
-
+def test_package_workers_gives_same_packages():
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR)
+    worker_packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, workers=2)
+    assert list(packs) == list(worker_packs)
+    for key, pack in packs.items():
+        assert pack.file_names == worker_packs[key].file_names
+        assert pack('station') == worker_packs[key]('station')
+
+
+def test_package_attributes_are_cached_until_file_is_added():
+    pack = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR)['SBE09_1387_20220823_1041_77SE_14_0600']
+    attributes = pack.attributes
+    assert pack.attributes is attributes
+    jpg_file = pack.get_files(suffix='.jpg')[0]
+    hdr_file = pack.get_file(suffix='.hdr')
+
+    new_pack = file_explorer.Package()
+    new_pack.add_file(jpg_file)
+    first_attributes = new_pack.attributes
+    assert first_attributes['nr_files'] == 1
+    assert 'station' not in first_attributes
+
+    new_pack.add_file(hdr_file)
+    assert new_pack.attributes is not first_attributes
+    assert new_pack.attributes['nr_files'] == 2
+    assert new_pack.attributes['station'] == hdr_file('station')
+    # Views returned before the change are not updated
+    assert first_attributes['nr_files'] == 1
+
+    second_attributes = new_pack.attributes
+    new_pack.set_key()
+    assert new_pack.attributes is not second_attributes
+    assert dict(new_pack.attributes) == dict(second_attributes)
+
+
+def test_package_attributes_are_reset_when_lazy_file_is_read():
+    pack = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, lazy=True)['SBE09_1387_20220823_1041_77SE_14_0600']
+    current_attributes = pack.current_attributes
+    assert 'station' not in current_attributes
+    assert pack('station')
+    assert pack.current_attributes is not current_attributes
+    assert pack.current_attributes['station'] == pack('station')
+    # The view returned before the file was read does not get the new values
+    assert 'station' not in current_attributes
+
+
+def test_package_add_files():
+    pack = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR)['SBE09_1387_20220823_1041_77SE_14_0600']
+    new_pack = file_explorer.Package()
+    assert new_pack.add_files(pack.files) == pack.nr_of_files
+    assert new_pack.add_files(pack.files) == 0
+    assert new_pack.key == pack.key
+    assert all(file.key == pack.key for file in new_pack.files)
@@ -0,0 +1,55 @@
+import pytest
+
+import file_explorer
+from file_explorer.package import Package
+from file_explorer.package_collection import PackageCollection
+from file_explorer.package_collection import read_parquet_dataset
+from file_explorer.tests.test_data import LOCAL_TEST_DIR
+
+
+def _get_collection():
+    packs = file_explorer.get_packages_in_directory(LOCAL_TEST_DIR, as_list=True)
+    return PackageCollection('test', packs)
+
+
+def test_package_collection_attributes_dataframe():
+    df = _get_collection().get_attributes_dataframe()
+    assert len(df) == 2
+    assert 'sensor_info' not in df.columns
+    assert str(df['datetime'].dtype).startswith('datetime64')
+
+
+def test_package_collection_write_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pandas as pd
+    collection = _get_collection()
+    path = collection.write_data_to_parquet(tmp_path)
+    assert [item.name for item in path.iterdir()] == ['year=2022']
+    df = read_parquet_dataset(path, filters=[('cruise', '=', '16')])
+    assert set(df['key']) == {'SBE09_1387_20220918_1305_77SE_16_0847'}
+    assert df['Pressure, Digiquartz [db]'].dtype == float
+
+    path = collection.write_attributes_to_parquet(tmp_path)
+    collection.write_attributes_to_parquet(tmp_path)
+    assert len(pd.read_parquet(path)) == 2
+
+
+def test_package_collection_parquet_partitions_are_strings(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    import pandas as pd
+    df = pd.DataFrame({'year': [2022, 2022], 'ship': ['77SE', '77SE'], 'cruise': ['02', '14'], 'serno': ['1', '2']})
+    monkeypatch.setattr(PackageCollection, 'get_attributes_dataframe', lambda self: df.copy())
+    df = read_parquet_dataset(_get_collection().write_attributes_to_parquet(tmp_path))
+    assert sorted(df['cruise']) == ['02', '14']
+    assert set(df['year']) == {'2022'}
+
+
+def test_package_collection_data_columns_named_as_attributes(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    import pandas as pd
+    monkeypatch.setattr(Package, 'get_data', lambda self, **kwargs: pd.DataFrame({'station': ['A'], 'value': [1.0]}))
+    collection = _get_collection()
+    df = collection.get_data_dataframe()
+    assert list(df.columns).count('station') == 1
+    assert list(df['station']) == ['A', 'A']
+    assert len(read_parquet_dataset(collection.write_data_to_parquet(tmp_path))) == 2
@@ -0,0 +1,99 @@
+import datetime
+import random
+
+import file_explorer
+from file_explorer import utils
+from file_explorer.package_index import PackageIndex
+from file_explorer.seabird import CnvFile
+from file_explorer.tests.test_data import CNV_TEST_FILE
+from file_explorer.tests.test_data import LOCAL_TEST_DIR
+
+
+class FakePackage:
+
+    def __init__(self, attributes):
+        self.attributes = attributes
+        self.current_attributes = attributes
+
+    def load_for_keys(self, *keys):
+        pass
+
+    def __call__(self, key):
+        return self.attributes.get(key, False)
+
+
+def _get_fake_packages(nr_packages=2000):
+    rnd = random.Random(7)
+    packages = []
+    for i in range(nr_packages):
+        attributes = {
+            'ship': rnd.choice(['77SE', '77se', '34AR', None]),
+            'year': rnd.choice(['2021', '2022', '2023']),
+            'serno': str(rnd.randint(1, 50)).zfill(4),
+            'datetime': rnd.choice([None, datetime.datetime(2021, 1, 1) + datetime.timedelta(hours=rnd.randint(0, 20000))]),
+            'lat': rnd.choice(['', str(rnd.uniform(55, 60))]),
+            'lon': str(rnd.uniform(10, 20)),
+        }
+        if i % 10 == 0:
+            attributes.pop('ship')
+        packages.append(FakePackage(attributes))
+    return packages
+
+
+def test_package_index_same_result_as_filter_packages():
+    packages = _get_fake_packages()
+    index = PackageIndex(packages)
+    queries = [
+        dict(ship='77se'),
+        dict(ship='77SE', year='2022'),
+        dict(serno='0007', year='2021'),
+        dict(year=2022),
+        dict(after=datetime.datetime(2022, 1, 1), before_equal=datetime.datetime(2022, 6, 1)),
+        dict(after_equal=datetime.datetime(2022, 3, 1, 5), ship='34ar'),
+        dict(lat_min=56, lat_max=57.5, lon_min=12),
+        dict(lat_min=58, IN_ship='se', year='2023'),
+        dict(IN_ship='se', year='02'),
+        dict(KC_ship='77SE', serno='0007'),
+        dict(),
+    ]
+    for query in queries:
+        expected = [pack for pack in packages if utils.is_matching(pack, **query)]
+        assert index.get_matching(**query) == expected
+        assert utils.filter_packages(packages, **query) == expected
+        assert utils.filter_packages(index, **query) == expected
+
+
+def test_filter_packages_uses_index_for_indexed_keys(monkeypatch):
+    packages = _get_fake_packages(200)
+    calls = []
+    get_matching = PackageIndex.get_matching
+
+    def _get_matching(self, **kwargs):
+        calls.append(kwargs)
+        return get_matching(self, **kwargs)
+
+    monkeypatch.setattr(PackageIndex, 'get_matching', _get_matching)
+    utils.filter_packages(packages, lat_min=56)
+    assert calls == []
+    utils.filter_packages(packages, ship='77SE', lat_min=56)
+    assert calls == [dict(ship='77SE', lat_min=56)]
+
+
+def test_package_collection_uses_index():
+    collection = file_explorer.get_package_collection_for_directory(LOCAL_TEST_DIR)
+    assert collection.get_latest_serno(ship='77SE', year='2022') == '0847'
+    assert collection.filter(cruise='14').keys == ['SBE09_1387_20220823_1041_77SE_14_0600']
+    assert collection.filter(after=datetime.datetime(2022, 9, 1)).keys == ['SBE09_1387_20220918_1305_77SE_16_0847']
+
+
+def test_hash_index_does_not_read_lazy_files(monkeypatch):
+    cnv = CnvFile(CNV_TEST_FILE, lazy=True)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError('File was read')
+
+    monkeypatch.setattr(CnvFile, '_save_info_from_file', _fail)
+    index = PackageIndex([cnv])
+    assert index.get_matching(serno='0511', ship='77SE') == [cnv]
+    assert index.get_matching(serno='0512') == []
+    assert not cnv.is_loaded
@@ -0,0 +1,43 @@
+from file_explorer import patterns
+from file_explorer.tests.test_data import TEST_DATA_DIR
+
+FILE_NAMES = [
+    'SBE09_1387_20220613_1800_77SE_11_0511.hex',
+    'uSBE09_1387_20220613_1800_77SE_11_0511.cnv',
+    'dSBE09_1387_20220823_1041_77SE_14_0600_2_sse_persgrund.jpg',
+    'SBE09_1387_20220613_1800_77SE_11_0511_test.cnv',
+    'sbe09_0745_20040628_1348_77_14_0420.cnv',
+    'SV04u0123.cnv',
+    'ctd_profile_20151007_7798_0001.txt',
+    'mvp_2021-10-17_071640_a13-a17.cnv',
+    'MVP_2021-10-17_071640_xedited.eng',
+    '123_ODV_77SE2021_12_ctd_v1.txt',
+    '_ODV_77SE2021_12_ctd_v1.txt',
+    'not_a_known_file.txt',
+]
+
+
+def _get_match_by_trying_all_patterns(string):
+    for pattern in patterns.FILE_NAME_PATTERNS:
+        name_match = pattern.search(string.strip().lower())
+        if name_match:
+            return name_match
+
+
+def test_file_name_classification_same_as_trying_all_patterns():
+    names = FILE_NAMES + [path.name for path in TEST_DATA_DIR.glob('**/*') if path.is_file()]
+    for name in names:
+        expected = _get_match_by_trying_all_patterns(name)
+        name_match = patterns.get_file_name_match(name)
+        if expected is None:
+            assert name_match is None
+            continue
+        assert name_match.re is expected.re
+        assert name_match.groupdict() == expected.groupdict()
+
+
+def test_file_name_classification_pattern_name():
+    assert patterns.get_file_name_pattern_name('SBE09_1387_20220613_1800_77SE_11_0511.hex') == 'sbe_standard'
+    assert patterns.get_file_name_pattern_name('sbe09_0745_20040628_1348_77_14_0420.cnv') == 'sbe_expedition'
+    assert patterns.get_file_name_pattern_name('ctd_profile_20151007_7798_0001.txt') == 'dv_profile'
+    assert patterns.get_file_name_pattern_name('not_a_known_file.txt') is None
@@ -0,0 +1,78 @@
+import pickle
+import shutil
+
+import pytest
+
+from file_explorer.seabird import CnvFile
+from file_explorer.seabird import XmlconFile
+from file_explorer.seabird import xmlcon_parser
+from file_explorer.tests.test_data import CNV_TEST_FILE
+from file_explorer.tests.test_data import TEST_DATA_DIR
+
+XMLCON_TEST_FILE = TEST_DATA_DIR / 'SBE09_1387_20220613_1800_77SE_11_0511.XMLCON'
+
+
+def test_sensor_info_is_shared_between_xmlcon_files(tmp_path):
+    path = tmp_path / 'SBE09_1387_20220614_1200_77SE_11_0512.XMLCON'
+    shutil.copy2(XMLCON_TEST_FILE, path)
+    xmlcon = XmlconFile(XMLCON_TEST_FILE)
+    other = XmlconFile(path)
+    assert xmlcon.sensor_info
+    assert other.sensor_info is xmlcon.sensor_info
+    assert other('instrument') == 'SBE09'
+    assert other('instrument_number') == '1387'
+
+
+def test_sensor_info_is_parsed_once_for_cnv_files(monkeypatch):
+    xmlcon_parser.clear_config_cache()
+    calls = []
+    get_sensor_info = xmlcon_parser.get_sensor_info
+
+    def _get_sensor_info(tree):
+        calls.append(tree)
+        return get_sensor_info(tree)
+
+    monkeypatch.setattr(xmlcon_parser, 'get_sensor_info', _get_sensor_info)
+    first = CnvFile(CNV_TEST_FILE)
+    second = CnvFile(CNV_TEST_FILE)
+    assert len(calls) == 1
+    assert second.sensor_info is first.sensor_info
+
+
+def test_sensor_info_can_not_be_changed():
+    sensor_info = XmlconFile(XMLCON_TEST_FILE).sensor_info
+    with pytest.raises(TypeError):
+        sensor_info[0]['parameter'] = 'new'
+    with pytest.raises(AttributeError):
+        sensor_info.append({})
+
+
+def test_sensor_info_is_shared_after_pickle():
+    xmlcon = XmlconFile(XMLCON_TEST_FILE)
+    loaded = pickle.loads(pickle.dumps(xmlcon))
+    assert loaded.sensor_info is xmlcon.sensor_info
+    assert loaded('sensor_info') is xmlcon.sensor_info
+    cnv = CnvFile(CNV_TEST_FILE)
+    assert pickle.loads(pickle.dumps(cnv)).sensor_info is cnv.sensor_info
+
+
+def test_partial_tree_gives_same_config_as_full_tree():
+    text = XMLCON_TEST_FILE.read_bytes()
+    full_tree = xmlcon_parser.get_parser_from_string(text)
+    tree = xmlcon_parser.get_partial_tree(text, xmlcon_parser.XMLCON_CONFIG_PATHS, chunk_size=100)
+    assert xmlcon_parser.get_sensor_info(tree) == xmlcon_parser.get_sensor_info(full_tree)
+    assert xmlcon_parser.get_instrument(tree) == xmlcon_parser.get_instrument(full_tree)
+    assert xmlcon_parser.get_instrument_number(tree) == xmlcon_parser.get_instrument_number(full_tree)
+    assert len(list(tree.iter())) < len(list(full_tree.iter()))
+
+
+def test_partial_tree_stops_after_paths():
+    text = '<Root><Other><Sub>1</Sub></Other><A><B>x</B></A><C><D/></C></Root><broken'
+    tree = xmlcon_parser.get_partial_tree(text, [('A', 'B')], chunk_size=10)
+    assert [elem.tag for elem in tree.getroot()] == ['A']
+    assert tree.find('A/B').text == 'x'
+
+
+def test_partial_tree_raises_for_invalid_xml():
+    with pytest.raises(xmlcon_parser.ET.ParseError):
+        xmlcon_parser.get_partial_tree('<Root><A></Root>', [('A', 'B')])
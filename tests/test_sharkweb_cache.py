@@ -0,0 +1,125 @@
+import datetime
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from file_explorer.sharkweb import cache as cache_module
+from file_explorer.sharkweb import physical_chemical
+from file_explorer.sharkweb.cache import SharkwebCache
+
+HEADER = ['MYEAR', 'SHIPC', 'VISITID', 'STATN', 'DEPH']
+
+
+class _SharkwebHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        year = payload['query']['fromYear']
+        self.server.requests.append(year)
+        self.send_response(200)
+        self.send_header('Location', f'/data/{year}')
+        self.end_headers()
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        year = self.path.split('/')[-1]
+        rows = [HEADER, [year, '77SE', '1', 'BY5', '0'], [year, '77SE', '2', 'BY15', '0']]
+        body = '\r\n'.join('\t'.join(row) for row in rows).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sharkweb_server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _SharkwebHandler)
+    server.requests = []
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get_cache(tmp_path, server, **kwargs):
+    return SharkwebCache(tmp_path, api_server=f'http://127.0.0.1:{server.server_port}', **kwargs)
+
+
+def test_sharkweb_cache_downloads_one_file_per_year(tmp_path, sharkweb_server):
+    cache = _get_cache(tmp_path, sharkweb_server)
+    paths = cache.get_files(2020, 2022)
+    assert [path.name for path in paths] == [f'sharkweb_Physical and Chemical_{year}.txt' for year in [2020, 2021, 2022]]
+    assert sorted(sharkweb_server.requests) == [2020, 2021, 2022]
+    assert cache.get_fetch_time(2021) is not None
+
+
+def test_sharkweb_cache_reuses_files(tmp_path, sharkweb_server):
+    cache = _get_cache(tmp_path, sharkweb_server)
+    cache.get_files(2020, 2021)
+    # New cache object reads the fetch times from the index file
+    _get_cache(tmp_path, sharkweb_server).get_files(2020, 2021)
+    assert sorted(sharkweb_server.requests) == [2020, 2021]
+
+
+def test_sharkweb_cache_refetches_current_year_after_ttl(tmp_path, sharkweb_server):
+    this_year = datetime.datetime.now().year
+    cache = _get_cache(tmp_path, sharkweb_server, ttl=datetime.timedelta(0))
+    cache.get_files(this_year - 1, this_year)
+    cache.get_files(this_year - 1, this_year)
+    assert sorted(sharkweb_server.requests) == [this_year - 1, this_year, this_year]
+
+
+def test_sharkweb_cache_metadata(tmp_path, sharkweb_server):
+    cache = _get_cache(tmp_path, sharkweb_server)
+    meta = cache.get_metadata(2021, 2022, columns=['station'])
+    assert meta['2022-77SE-0002']['station'] == 'BY15'
+    assert set(meta) == {'2021-77SE-0001', '2021-77SE-0002', '2022-77SE-0001', '2022-77SE-0002'}
+    assert list(tmp_path.glob('*.metadata.pickle'))
+    assert cache.get_metadata(2021, 2022, columns=['station']) == meta
+
+
+def test_sharkweb_cache_uses_old_file_if_server_is_down(tmp_path, sharkweb_server):
+    cache = _get_cache(tmp_path, sharkweb_server, ttl=datetime.timedelta(0))
+    this_year = datetime.datetime.now().year
+    path = cache.get_file(this_year)
+    sharkweb_server.shutdown()
+    sharkweb_server.server_close()
+    assert cache.get_file(this_year) == path
+
+
+def test_sharkweb_cache_downloads_years_concurrently(tmp_path, sharkweb_server):
+    sharkweb_server.delay = 0.2
+    cache = _get_cache(tmp_path, sharkweb_server, workers=4)
+    assert len(cache.get_files(2019, 2022)) == 4
+    assert sharkweb_server.max_in_flight > 1
+
+
+def test_sharkweb_cache_parses_metadata_while_downloading(tmp_path, sharkweb_server, monkeypatch):
+    cache = _get_cache(tmp_path, sharkweb_server)
+    path = cache.fetch(2022, columns=['station'])
+    assert cache._get_metadata_cache_path(path).exists()
+    expected = physical_chemical.get_metadata_from_sharkweb_btl_data(path, columns=['station'], encoding='utf8')
+    assert expected
+
+    def _fail(*args, **kwargs):
+        raise AssertionError('Downloaded file was parsed again')
+
+    # Metadata is stored by the download and not parsed from the file again
+    monkeypatch.setattr(cache_module, 'get_metadata_from_sharkweb_btl_data', _fail)
+    assert cache.get_metadata(2022, columns=['station']) == expected
@@ -0,0 +1,137 @@
+import importlib
+import os
+import pathlib
+import sys
+import types
+
+from file_explorer import content_hash
+from file_explorer import utils
+from file_explorer.file_handler import sync
+from file_explorer.tests.test_data import CNV_TEST_FILE
+from file_explorer.tests.test_data import CNV_TEST_FILE_2
+from file_explorer.tests.test_data import HDR_TEST_FILE
+
+
+def _get_pairs(target_directory):
+    return [(path, pathlib.Path(target_directory, path.name)) for path in [CNV_TEST_FILE, CNV_TEST_FILE_2,
+                                                                           HDR_TEST_FILE]]
+
+
+def test_sync_files_copies_and_skips(tmp_path):
+    pairs = _get_pairs(tmp_path)
+    result = sync.sync_files(pairs, workers=2)
+    assert len(result['copied']) == 3
+    for source, target in pairs:
+        assert target.read_bytes() == source.read_bytes()
+    assert not list(tmp_path.glob(f'*{sync.TEMP_SUFFIX}'))
+
+    result = sync.sync_files(pairs, workers=2)
+    assert len(result['skipped']) == 3
+
+
+def test_sync_files_updates_changed_file(tmp_path):
+    pairs = _get_pairs(tmp_path)
+    sync.sync_files(pairs, use_manifest=True)
+    target = pairs[0][1]
+    target.write_bytes(target.read_bytes()[::-1])
+    os.utime(target, (1, 1))
+    result = sync.sync_files(pairs, use_manifest=True)
+    assert result['copied'] == [target]
+    assert target.read_bytes() == pairs[0][0].read_bytes()
+    assert pathlib.Path(tmp_path, sync.MANIFEST_FILE_NAME).exists()
+
+    result = sync.sync_files(pairs, update=False)
+    assert len(result['skipped']) == 3
+
+
+def test_sync_journal_removes_temp_files_from_interrupted_copy(tmp_path):
+    journal = sync.SyncJournal(pathlib.Path(tmp_path, 'sync.journal'))
+    target = pathlib.Path(tmp_path, 'server', CNV_TEST_FILE.name)
+    target.parent.mkdir()
+    journal.add('started', target)
+    temp_path = sync._get_temp_path(target)
+    temp_path.write_text('half a file')
+
+    result = sync.sync_files([(CNV_TEST_FILE, target)], journal=journal)
+    assert result['copied'] == [target]
+    assert not temp_path.exists()
+    assert not journal.path.exists()
+
+
+def test_files_are_equal():
+    assert sync.files_are_equal(CNV_TEST_FILE, CNV_TEST_FILE)
+    assert not sync.files_are_equal(CNV_TEST_FILE, HDR_TEST_FILE)
+
+
+def test_file_hash_uses_content_hash_cache(tmp_path, monkeypatch):
+    path = pathlib.Path(tmp_path, CNV_TEST_FILE.name)
+    path.write_bytes(CNV_TEST_FILE.read_bytes())
+    content_hash.clear_cache()
+    calls = []
+    compute_content_hash = content_hash.compute_content_hash
+
+    def _compute(*args, **kwargs):
+        calls.append(args)
+        return compute_content_hash(*args, **kwargs)
+
+    monkeypatch.setattr(content_hash, 'compute_content_hash', _compute)
+    md5 = sync.get_file_hash(path)
+    assert md5 == content_hash.get_content_hash(path, 'md5')
+    assert sync.HashManifest(tmp_path).get_hash(path) == md5
+    assert len(calls) == 1
+
+
+def test_files_are_equal_with_mtime_tolerance(tmp_path):
+    source = pathlib.Path(tmp_path, 'source.txt')
+    target = pathlib.Path(tmp_path, 'target.txt')
+    source.write_text('abc')
+    target.write_text('abd')
+    os.utime(source, (1000, 1000))
+    os.utime(target, (1001, 1001))
+    assert not sync.files_are_equal(source, target)
+    assert sync.files_are_equal(source, target, mtime_tolerance=sync.MTIME_TOLERANCE)
+
+
+def _get_seabird_ctd_module(monkeypatch):
+    # ctd_processing is an optional dependency only needed for its exceptions
+    ctd_processing = types.ModuleType('ctd_processing')
+    ctd_processing.exceptions = types.ModuleType('ctd_processing.exceptions')
+    monkeypatch.setitem(sys.modules, 'ctd_processing', ctd_processing)
+    monkeypatch.delitem(sys.modules, 'file_explorer.file_handler.seabird_ctd', raising=False)
+    return importlib.import_module('file_explorer.file_handler.seabird_ctd')
+
+
+def test_sbe_file_handler_copy_files_to_server(tmp_path, monkeypatch):
+    seabird_ctd = _get_seabird_ctd_module(monkeypatch)
+    monkeypatch.setattr(utils, 'EXPLORER_DIRECTORY', pathlib.Path(tmp_path, 'file_explorer'))
+    config = dict(local=dict(cnv=dict(rel_path='cnv')), server=dict(cnv=dict(rel_path='cnv')))
+    handler = seabird_ctd.SBEFileHandler(config)
+    for root_key in ['local', 'server']:
+        pathlib.Path(tmp_path, root_key, 'cnv').mkdir(parents=True)
+        handler.set_root_dir(root_key, pathlib.Path(tmp_path, root_key))
+
+    local_paths = []
+    for path in [CNV_TEST_FILE, CNV_TEST_FILE_2]:
+        local_path = pathlib.Path(handler.get_dir('local', 'cnv'), path.name)
+        local_path.write_bytes(path.read_bytes())
+        local_paths.append(local_path)
+    handler.local_files = dict((('cnv', path.name), seabird_ctd.File(path)) for path in local_paths)
+    handler.server_files = {}
+
+    result = handler.copy_files_to_server(workers=2)
+    server_paths = [pathlib.Path(handler.get_dir('server', 'cnv'), path.name) for path in local_paths]
+    assert sorted(result['copied']) == sorted(server_paths)
+    for local_path, server_path in zip(local_paths, server_paths):
+        assert server_path.read_bytes() == local_path.read_bytes()
+
+    handler.server_files = dict((('cnv', path.name), seabird_ctd.File(path)) for path in server_paths)
+    assert not handler.not_updated_on_server()
+    assert handler.copy_files_to_server() == dict(copied=[], skipped=[], failed=[])
+
+    local_paths[0].write_bytes(local_paths[0].read_bytes()[::-1])
+    assert handler.not_updated_on_server()
+    result = handler.copy_files_to_server(update=True)
+    assert result['copied'] == [server_paths[0]]
+    assert result['skipped'] == [server_paths[1]]
+    assert server_paths[0].read_bytes() == local_paths[0].read_bytes()
+    assert not list(pathlib.Path(tmp_path, 'file_explorer', '_temp', 'sync').iterdir())
@@ -0,0 +1,69 @@
+import pathlib
+import threading
+import time
+
+from file_explorer.file_handler.watcher import EventBatcher
+
+PATH = pathlib.Path('a.cnv')
+OTHER_PATH = pathlib.Path('b.cnv')
+
+
+def _get_batcher(window=10.0, dispatch=None):
+    events = []
+
+    def _dispatch(_id, data):
+        events.append((data['event_type'], data['src_path']))
+
+    return EventBatcher('test', window=window, dispatch=dispatch or _dispatch), events
+
+
+def _data(event_type, path=PATH):
+    return dict(event_type=event_type, src_path=path, dest_path=None)
+
+
+def test_event_batcher_collapses_events_per_path():
+    batcher, events = _get_batcher()
+    batcher.add(_data('created'))
+    for _ in range(20):
+        batcher.add(_data('modified'))
+    batcher.add(_data('modified', OTHER_PATH))
+    batcher.add(_data('opened', OTHER_PATH))
+    batcher.stop()
+    assert sorted(events) == [('created', PATH), ('modified', OTHER_PATH)]
+
+
+def test_event_batcher_created_and_deleted_gives_no_event():
+    batcher, events = _get_batcher()
+    batcher.add(_data('created'))
+    batcher.add(_data('modified'))
+    batcher.add(_data('deleted'))
+    batcher.stop()
+    assert events == []
+
+
+def test_event_batcher_dispatches_settled_events():
+    batcher, events = _get_batcher(window=0.05)
+    batcher.add(_data('modified'))
+    for _ in range(50):
+        if events:
+            break
+        time.sleep(0.02)
+    assert events == [('modified', PATH)]
+    batcher.stop()
+
+
+def test_event_batcher_slow_callback_does_not_block_add():
+    release = threading.Event()
+
+    def _slow_dispatch(_id, data):
+        release.wait(5)
+
+    batcher, _ = _get_batcher(window=0, dispatch=_slow_dispatch)
+    batcher.add(_data('modified'))
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    for i in range(100):
+        batcher.add(_data('modified', pathlib.Path(f'{i}.cnv')))
+    assert time.monotonic() - t0 < 1
+    release.set()
+    batcher.stop()